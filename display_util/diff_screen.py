@@ -0,0 +1,80 @@
+class DiffScreen:
+    """Stands in for a curses screen, and keeps a copy of what's been drawn to it.
+
+    addstr only changes the copy, refresh then compares it against what was on the terminal after the last refresh,
+    and only writes the part of each row that changed, so redrawing a frame that's mostly the same as the last one
+    costs next to nothing. Anything that draws straight to the real screen should call invalidate afterwards."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.back = {}
+        self.front = {}
+        self.dirty = set()
+        self.cells_written = 0
+
+    def addstr(self, y: int, x: int, string: str):
+        """Draws a single line string at the given position, without touching the terminal"""
+        row = self.back.get(y, '')
+        end = x + len(string)
+        if row[x:end] == string:
+            return
+
+        if len(row) < x:
+            row += ' ' * (x - len(row))
+        self.back[y] = row[:x] + string + row[end:]
+        self.dirty.add(y)
+
+    def refresh(self) -> int:
+        """Writes every changed span to the terminal and refreshes it, returns the number of cells written"""
+        written = 0
+
+        for y in self.dirty:
+            new = self.back[y]
+            old = self.front.get(y)
+            if new == old:
+                continue
+
+            if old is None:
+                # Nothing is known about what's on this row of the terminal, so all of it gets written
+                first, last = 0, len(new) - 1
+            else:
+                width = max(len(new), len(old))
+                new = new.ljust(width)
+                old = old.ljust(width)
+                if new == old:
+                    continue
+
+                # Only the span between the first and the last changed cells gets written
+                first = 0
+                while new[first] == old[first]:
+                    first += 1
+                last = width - 1
+                while new[last] == old[last]:
+                    last -= 1
+
+            if last >= first:
+                self.screen.addstr(y, first, new[first:last + 1])
+                written += last + 1 - first
+            self.front[y] = new
+
+        self.dirty.clear()
+
+        if written:
+            self.screen.refresh()
+        self.cells_written += written
+
+        return written
+
+    def invalidate(self):
+        """Forgets what's on the terminal so that the next refresh redraws everything,
+        for after something else has drawn over it"""
+        self.front = {}
+        self.dirty = set(self.back)
+
+    def clear(self):
+        """Clears the terminal, and the copy of it"""
+        self.back = {}
+        self.front = {}
+        self.dirty = set()
+        self.screen.clear()
+        self.screen.refresh()
@@ -2,11 +2,11 @@ from .string_display_util import print_error, print_dashes, hanging_indent, cent
     boxed_text
 from .list_display_util import ListTypes, get_list_entry_str
 
-from colorama import Fore
-import curses
-
 from copy import deepcopy
-from multiprocessing import Queue
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tetris.input.transport import EventReceiver
 
 
 def add_multiline_string(string: str, screen, x_pos: int = 0, y_pos: int = 0, refresh: bool = True):
@@ -22,6 +22,8 @@ def add_multiline_string(string: str, screen, x_pos: int = 0, y_pos: int = 0, re
 def get_constrained_input(prompt: str, constraint, screen, x_pos: int = 0, y_pos: int = 0) -> str:
     """Prompts the user for input, continues to prompt the user for input until the lambda expression passed in for
         constraint returns True."""
+    import curses
+    from colorama import Fore
 
     key = ''
 
@@ -97,8 +99,8 @@ def console_box_menu(options: dict, screen, list_format: str = "{}: {}", title:
     return list(options.keys())[index]
 
 
-def console_gamepad_box_menu(options: dict, screen, event_q: Queue, list_format: str = "{}: {}", title: str = "",
-                             centered_title: bool = True, tab_width: int = 4,
+def console_gamepad_box_menu(options: dict, screen, event_q: 'EventReceiver', list_format: str = "{}: {}",
+                             title: str = "", centered_title: bool = True, tab_width: int = 4,
                              x_pos: int = 0, y_pos: int = 0):
     """Creates a console style menu with the given options as choices to choose from
     Returns a key that was chosen from the options dict.
@@ -1,5 +1,4 @@
 import shutil
-from colorama import Fore
 
 import sys
 import traceback
@@ -37,30 +36,25 @@ def aligned_text(string: str, length: int, alignment: AlignmentType = AlignmentT
         raise AssertionError("Length of the string cannot be greater than the maximum length for alignment")
 
     if alignment == AlignmentType.LEFT:
-        return string + ' ' * diff
+        return string.ljust(length)
     elif alignment == AlignmentType.CENTER:
-        bit = ' ' * (diff // 2)
-        return bit + string + bit + (' ' if diff % 2 == 1 else '')
+        # Any odd space goes at the end
+        return (' ' * (diff // 2) + string).ljust(length)
     elif alignment == AlignmentType.RIGHT:
-        return ' ' * diff + string
+        return string.rjust(length)
 
 
 def hstack(strings: list, alignment: AlignmentType = AlignmentType.LEFT) -> str:
     """Stacks a series of multiline strings together horizontally"""
     string_list = [s.splitlines(False) for s in strings]
     widths = [max([len(s) for s in ss]) for ss in string_list]
-    result = ""
+    height = max([len(s) for s in string_list])
 
-    for i in range(max([len(s) for s in string_list])):
-        for s in range(len(string_list)):
-            sl = string_list[s]
-            if i < len(sl):
-                result += aligned_text(sl[i], widths[s], alignment)
-            else:
-                result += " " * widths[s]
-        result += '\n'
+    # Pads every column out to the same height first, so each line is a single join
+    columns = [[aligned_text(line, w, alignment) for line in sl] + [' ' * w] * (height - len(sl))
+               for sl, w in zip(string_list, widths)]
 
-    return result
+    return ''.join(''.join(line) + '\n' for line in zip(*columns))
 
 
 def control_arrows(mappings: dict):
@@ -97,26 +91,13 @@ def control_arrows(mappings: dict):
 def boxed_text(string: str, alignment: AlignmentType = AlignmentType.CENTER):
     lines = string.splitlines(False)
     width = max(len(x) for x in lines)
-    height = len(lines)
-    result = ""
 
-    # Top line
-    result += '\u2554'
-    for k in range(width):
-        result += '\u2550'
-    result += '\u2557\n'
+    parts = ['\u2554' + '\u2550' * width + '\u2557']
+    parts.extend('\u2551' + aligned_text(line, width, alignment) + '\u2551' for line in lines)
+    parts.append('\u255A' + '\u2550' * width + '\u255D')
+    parts.append('')
 
-    # Body
-    for h in range(height):
-        result += '\u2551' + aligned_text(lines[h], width, alignment) + '\u2551\n'
-
-    # Bottom line
-    result += '\u255A'
-    for k in range(width):
-        result += '\u2550'
-    result += '\u255D\n'
-
-    return result
+    return '\n'.join(parts)
 
 
 def centered_text(text: str, length: int = -1) -> str:
@@ -219,18 +200,21 @@ def print_list(arr: list, format: str = "{}: {}", l_type: ListTypes = ListTypes.
 def print_info(string: str, begin: str = '') -> str:
     """Prints an info prompt to the console
     info prompts have '[INFO]' as a prefix and are printed in Yellow."""
+    from colorama import Fore
     return begin + Fore.YELLOW + "[INFO] " + string + Fore.RESET
 
 
 def print_warning(string: str, begin: str = '') -> str:
     """Prints an warning prompt to the console
     warning prompts have '[WARNING]' as a prefix and are printed in Red."""
+    from colorama import Fore
     return begin + Fore.RED + "[WARNING] " + string + Fore.RESET
 
 
 def print_error(string: str, begin: str = '') -> str:
     """Prints an error prompt to the console
     error prompts have '[ERROR]' as a prefix and are printed in Red."""
+    from colorama import Fore
     return begin + Fore.RED + "[ERROR] " + string + Fore.RESET
 
 
@@ -248,4 +232,5 @@ def print_exception(begin: str = '') -> str:
 def print_notification(string: str, begin: str = '') -> str:
     """Prints an notification prompt to the console
     notification prompts have '[NOTIFICATION]' as a prefix and are printed in Green."""
+    from colorama import Fore
     return begin + Fore.GREEN + "[NOTIFICATION] " + string + Fore.RESET
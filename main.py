@@ -1,11 +1,15 @@
+import asyncio
 import curses
+import sys
 import time
-from queue import Empty
 
 from tetris.classes import Tetris
+from tetris.async_runtime import AsyncRuntime
 from display_util.string_display_util import boxed_text
 from display_util.menu import add_multiline_string
+from display_util.diff_screen import DiffScreen
 from tetris.input.gamepad import PygameEventReader, GamePadEventType
+from tetris.input.latency import InputLatency
 import tetris.input.gamepad as gp
 
 
@@ -13,7 +17,6 @@ import tetris.input.gamepad as gp
 # TODO Make the display controller friendly
 
 # TODO Fix control display panel
-# TODO Test the new piece_control fixes for button-repeating when a button is held
 # TODO Get Gamepad working in the main game (Port piece_control.py over to main.py)
 
 # TODO Wire up the controls and collision detection
@@ -21,14 +24,40 @@ import tetris.input.gamepad as gp
 
 # Reference: https://www.colinfahey.com/tetris/tetris.html
 
+REPLAY_PATH = 'last_game.replay'
+"""Where the game is saved to when it's run with --record and no path is given after it"""
+
+MAX_CATCH_UP_TICKS = 5
+"""Most simulation ticks that are run back to back when the loop falls behind, any more than this are skipped
+so that a long stall doesn't turn into a burst of gravity"""
+
+
+def record_path(args: list) -> str:
+    """Returns where the game should be recorded to, the argument after --record if there is one,
+    otherwise REPLAY_PATH, or None if the game isn't being recorded"""
+    if '--record' not in args:
+        return None
+
+    index = args.index('--record') + 1
+    if index < len(args) and not args[index].startswith('--'):
+        return args[index]
+    return REPLAY_PATH
+
+
 class Game(Tetris):
-    def __init__(self, screen, num_players: int = 1, board_width: int = 10, board_height: int = 20, scale: int = 1):
-        super().__init__(0, 0, num_players, board_width, board_height, scale)
-        self.screen = screen
+    def __init__(self, screen, num_players: int = 1, board_width: int = 10, board_height: int = 20, scale: int = 1,
+                 bots: bool = False, tick_rate: int = 120, frame_cap: int = 30, record: bool = False):
+        super().__init__(0, 0, num_players, board_width, board_height, scale, bots=bots, record=record)
+        self.screen = DiffScreen(screen)
         self.is_stopping = False
         self.reset()
 
-        self.event_q = PygameEventReader.q
+        # The simulation advances on a fixed tick, the screen is redrawn at most frame_cap times a second
+        self.tick_interval = 1 / tick_rate
+        self.frame_interval = 1 / frame_cap
+
+        self.event_q = PygameEventReader.events
+        self.latency = InputLatency()
 
         self.sticks = gp.get_wrappers()
 
@@ -39,22 +68,22 @@ class Game(Tetris):
         return x + self.control_box_width + (len(self.boards) * self.board_width) // 2, y + self.board_height // 2
 
     def refresh_screen(self):
-        """Paints the window to the console"""
+        """Paints the window to the console, only the cells that changed since the last time are actually written"""
         self.add_to_screen(self.screen)
         self.screen.refresh()
+        self.latency.painted()
 
     def __show_countdown(self):
         """Counts down from 10 on each player's board while showing what the starting piece will be."""
+        start = time.monotonic()
         for i in range(10, 0, -1):
-            self.refresh_screen()
-            for b in self.boards:
-                x, y = b.offset
-                x += self.board_width_adj // 2
-                y += self.board_height_total // 2
-                self.screen.addstr(y, x, "{}".format(i))
+            self.add_countdown_to_screen(self.screen, i)
             self.screen.refresh()
             time.sleep(1)
 
+        # Nobody gets to move during the countdown, so it's the same as being paused
+        self.resume(time.monotonic() - start)
+
     def start(self):
         """Starts the game"""
         self.newgame()
@@ -62,6 +91,9 @@ class Game(Tetris):
         self.__show_countdown()
         self.__event_loop()
 
+        # Shows the game over screen
+        self.refresh_screen()
+
     def main_menu(self):
         """Displays the main menu for the game"""
         menu_string = boxed_text('Tetris!\n1: Single player\n2: Two player\n3: Three player\n4: Four player')
@@ -71,7 +103,9 @@ class Game(Tetris):
         pass
 
     def pause(self):
-        """Pauses the game"""
+        """Pauses the game, the time spent paused doesn't count towards any of the boards' gravity"""
+        start = time.monotonic()
+        self.refresh_screen()
 
         # Creates and displays the pause menu
         pause_string = boxed_text("Paused!\nPress any key to continue...")
@@ -85,43 +119,71 @@ class Game(Tetris):
 
             if key.event_type == GamePadEventType.BUTTON:
                 if key.data.button == 9 and not key.data.status:
-                    self.refresh_screen()
                     break
                 else:
                     continue
             else:
                 continue
 
+        self.resume(time.monotonic() - start)
+
+        self.refresh_screen()
+
+    def __tick(self):
+        """Advances the simulation by one fixed tick, lets the bots move, and applies gravity to the boards"""
+        for p in self.players:
+            p.update()
+        for b in self.boards:
+            b.update()
+
+    def __handle_event(self, event, captured: float) -> bool:
+        """Calls the board function that the event is mapped to, if any, or pauses the game for the menu button,
+        returns True if the game was paused"""
+        if self.dispatch(event):
+            self.latency.applied(captured)
+
+        if event.event_type == GamePadEventType.BUTTON:
+            # Check if the key was a menu key
+            if event.data.button == 9 and not event.data.status:
+                self.pause()
+                return True
+            else:
+                self.screen.addstr(0, 0, str(event))
+
+        return False
+
     def __event_loop(self):
-        """Loops and collects user-input, using it as necessary and calling the corresponding methods"""
-
-        while not self.is_stopping:
-            self.refresh_screen()
-
-            try:
-                event = self.event_q.get_nowait()
-
-                # Check if the button corresponds to a player
-                for p in self.players:
-                    if event.joypad in p:
-                        if event.data in p:
-                            index = list(p.keys.values()).index(event.data)
-                            p.get_function(list(p.keys.keys())[index])()
-
-                if event.event_type == GamePadEventType.BUTTON:
-                    # Check if the key was a menu key
-                    if event.data.button == 9 and not event.data.status:
-                        self.pause()
-                        continue
-                    else:
-                        self.screen.addstr(0, 0, str(event))
-                        self.screen.refresh()
-                        time.sleep(1)
-
-            except Empty:
-                for b in self.boards:
-                    b.update()
-                continue
+        """Loops and collects user-input, using it as necessary and calling the corresponding methods
+
+        The simulation runs on a fixed tick and the screen is drawn on its own schedule, in between the loop sleeps
+        on the event queue until either an event arrives or the next tick or frame is due"""
+        next_tick = next_frame = time.monotonic()
+
+        # Ends once every board's game is over, the same as the async runtime
+        while not self.is_stopping and self.playing:
+            now = time.monotonic()
+
+            ticks = 0
+            while now >= next_tick and ticks < MAX_CATCH_UP_TICKS:
+                self.__tick()
+                next_tick += self.tick_interval
+                ticks += 1
+            if now >= next_tick:
+                next_tick = now + self.tick_interval
+
+            if now >= next_frame:
+                self.refresh_screen()
+                next_frame += self.frame_interval
+                if next_frame <= now:
+                    next_frame = now + self.frame_interval
+
+            # Everything that arrived since the last pass is handled together
+            for event, captured in self.event_q.drain_timed(max(0.0, min(next_tick, next_frame) - time.monotonic())):
+                self.latency.dequeued(captured)
+
+                # Pausing stops the clock, so the schedule starts over from when the game was resumed
+                if self.__handle_event(event, captured):
+                    next_tick = next_frame = time.monotonic()
 
 
 def main():
@@ -141,12 +203,24 @@ def main():
 
     stdscr.clear()
 
+    latency = None
+    t = None
+    replay_path = record_path(sys.argv)
+
     try:
 
-        t = Game(stdscr, 1, scale=2)
+        t = Game(stdscr, 1, scale=2, record=replay_path is not None)
+        latency = t.latency
 
-        t.start()
+        if '--async' in sys.argv:
+            runtime = AsyncRuntime(t, t.screen, t.event_q, countdown=10)
+            latency = runtime.latency
+            asyncio.run(runtime.run())
+        else:
+            t.start()
 
+        # Waits on the game over screen until a key is pressed
+        stdscr.nodelay(False)
         stdscr.refresh()
         stdscr.getkey()
 
@@ -161,6 +235,13 @@ def main():
 
         # endregion
 
+        if '--latency' in sys.argv and latency is not None:
+            print(latency.report())
+
+        # Saved even if the game was interrupted, since that's often the game worth reproducing
+        if t is not None and t.recorder is not None:
+            t.recorder.replay.save(replay_path)
+
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,6 @@
 import curses
 import random
 import time
-import pygame
 from queue import Empty
 
 import tetris.input.gamepad as gp
@@ -11,9 +10,6 @@ from tetris.input.gamepad import GamePadEventType, HatPositionType, display_game
 from tetris.classes import Player, Board
 
 
-pygame.init()
-
-
 delay = 0.5
 
 
@@ -37,7 +33,7 @@ def main():
 
     stdscr.clear()
 
-    q = gp.PygameEventReader.q
+    q = gp.PygameEventReader.events
     sticks = gp.get_wrappers()
     for s in sticks:
         display_gamepad_info(s.joy)
@@ -45,7 +41,7 @@ def main():
     # region Player setup
 
     player_keymappings = {KeyMappings.SHIFT_LEFT: GamePadHatEventData(0, HatPositionType.LEFT, True),
-                          KeyMappings.SOFT_DROP: GamePadHatEventData(0, HatPositionType.DOWN, False),
+                          KeyMappings.SOFT_DROP: GamePadHatEventData(0, HatPositionType.DOWN, True),
                           KeyMappings.SHIFT_RIGHT: GamePadHatEventData(0, HatPositionType.RIGHT, True),
                           KeyMappings.ROTATE: GamePadButtonEventData(0, False),
                           KeyMappings.DROP: GamePadButtonEventData(3, False)}
@@ -73,22 +69,14 @@ def main():
                 b1.add_to_screen(stdscr)
                 stdscr.refresh()
 
+                # Repeats whatever is being held down
+                p1.update()
+
                 try:
-                    event = q.get_nowait()
-
-                    if event.data in p1:
-                        if event.event_type == GamePadEventType.BUTTON:
-                            if not event.data.status:
-                                if event.data.button == 3:
-                                    b1.drop()
-                                elif event.data.button == 0:
-                                    b1.rotate()
-                        elif event.event_type == GamePadEventType.DIRECTIONAL_PAD:
-                            if not event.data.status:
-                                if event.data.hat_button == HatPositionType.RIGHT:
-                                    b1.right()
-                                elif event.data.hat_button == HatPositionType.LEFT:
-                                    b1.left()
+                    event = q.get(timeout=0.005)
+
+                    for function in p1.handlers.get(event.data, ()):
+                        function()
 
                     if event.event_type == GamePadEventType.BUTTON:
                         if event.data.button == 9:
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from tetris.classes import Tetris
+from tetris.async_runtime import AsyncRuntime
+
+
+async def play_all(runtimes: list, duration: float):
+    """Plays every game on the same event loop, and stops them all after duration seconds"""
+    tasks = [asyncio.ensure_future(r.run()) for r in runtimes]
+    await asyncio.sleep(duration)
+    for r in runtimes:
+        r.stop()
+    await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    games = 50
+    duration = 5
+
+    runtimes = []
+    for seed in range(games):
+        t = Tetris(0, 0, 1, seed=seed, bots=True)
+        t.players[0].move_delay = 0.02
+        runtimes.append(AsyncRuntime(t))
+
+    cpu = time.process_time()
+    asyncio.run(play_all(runtimes, duration))
+    cpu = time.process_time() - cpu
+
+    pieces = sum(b.pieces_placed for r in runtimes for b in r.game.boards)
+    print('{} games for {}s on one event loop: {} pieces placed, {:.0%} of a core'.format(
+        games, duration, pieces, cpu / duration))
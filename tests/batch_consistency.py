@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+
+from tetris.batch import BatchEngine, NO_ACTION
+from tetris.engine import BoardEngine
+from tetris.shared import KeyMappings
+
+
+BOARDS = 200
+
+
+def choose_action(board: BoardEngine, path: list, moves: random.Random) -> int:
+    """Returns the board's next move along the path to one of the lowest placements of its current piece, with some
+    random moves mixed in, which throw the path away, uniformly random moves stack pieces up without clearing lines"""
+    if not board.playing:
+        return NO_ACTION
+
+    if moves.random() < 0.05:
+        path.clear()
+        return moves.randrange(NO_ACTION, 5)
+
+    if not path:
+        placements = board.placements()
+        if not placements:
+            return NO_ACTION
+        lowest = max(p.y for p in placements)
+        path.extend(moves.choice([p for p in placements if p.y == lowest]).path)
+
+    return path.pop(0).value
+
+
+def follow(batch: BatchEngine, index: int) -> BoardEngine:
+    """Creates a BoardEngine that takes each of its pieces from the batch board at index, so that both of them get
+    the same pieces in the same order"""
+    board = BoardEngine(lambda: None, batch.width, batch.height)
+
+    def next_piece():
+        if board.read_for_piece:
+            board.new_piece(int(batch.state['piece'][index]))
+
+    board.piece_callback = next_piece
+    next_piece()
+    return board
+
+
+def check_board(batch: BatchEngine, index: int, board: BoardEngine, step: int):
+    """Compares one batch board against the BoardEngine that was given the same actions"""
+    s = batch.state[index]
+    where = "Board {} step {}".format(index, step)
+
+    assert bool(s['playing']) == board.playing, "{} playing {} should be {}".format(where, s['playing'], board.playing)
+    assert (batch.grids[index].T == board.settled).all(), "{} has different settled cells".format(where)
+    assert (s['score'], s['lines'], s['level'], s['pieces_placed']) == \
+           (board.score, board.lines, board.level, board.pieces_placed), \
+        "{} score, lines, level, pieces {} should be {}".format(
+            where, (s['score'], s['lines'], s['level'], s['pieces_placed']),
+            (board.score, board.lines, board.level, board.pieces_placed))
+
+    if board.playing:
+        assert (batch.get_grid(index) == board.grid).all(), "{} has a different current piece".format(where)
+
+
+if __name__ == "__main__":
+    batch = BatchEngine(BOARDS, seed=0)
+    boards = [follow(batch, i) for i in range(BOARDS)]
+    moves = random.Random(0)
+    paths = [[] for _ in boards]
+
+    steps = 0
+    while batch.playing.any():
+        actions = np.array([choose_action(b, path, moves) for b, path in zip(boards, paths)])
+
+        # Both engines take the action and the gravity step in the same order, so they lock pieces at the same time
+        batch.apply(actions)
+        for b, action in zip(boards, actions):
+            if b.playing and action != NO_ACTION:
+                b.get_function(KeyMappings(int(action)))()
+
+        batch.gravity()
+        for b in boards:
+            b.step()
+
+        steps += 1
+        for i, b in enumerate(boards):
+            check_board(batch, i, b, steps)
+
+    print('{} boards, {} steps, {} pieces and {} lines matched BoardEngine'.format(
+        BOARDS, steps, batch.state['pieces_placed'].sum(), batch.state['lines'].sum()))
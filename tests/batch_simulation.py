@@ -0,0 +1,22 @@
+import time
+import numpy as np
+
+from tetris.batch import BatchEngine, NO_ACTION
+
+
+if __name__ == "__main__":
+    boards = 4096
+    engine = BatchEngine(boards, seed=0)
+    actions = np.random.default_rng(0)
+
+    steps = 0
+    start = time.time()
+    while engine.playing.any():
+        engine.step(actions.integers(NO_ACTION, 5, boards))
+        steps += 1
+    duration = time.time() - start
+
+    print('{} boards, {} steps in {:.2f}s ({:.0f} board steps/sec)'.format(boards, steps, duration,
+                                                                             boards * steps / duration))
+    print('Pieces placed: {}, lines cleared: {}'.format(engine.state['pieces_placed'].sum(),
+                                                         engine.state['lines'].sum()))
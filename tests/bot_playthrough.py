@@ -0,0 +1,46 @@
+import time
+
+from tetris.engine import TetrisEngine
+from tetris.bot import HeuristicBot
+from tetris.shared import iteration_delay
+
+
+MOVE_BUDGET = iteration_delay(10)
+"""The time a piece gets between gravity steps at level 10, no decision is allowed to take longer than this"""
+
+
+if __name__ == "__main__":
+    games = 10
+
+    for lookahead in (0, 1):
+        bot = HeuristicBot(lookahead=lookahead)
+
+        decisions = []
+        lines = []
+        for seed in range(games):
+            t = TetrisEngine(1, seed=seed, bag=True)
+            t.newgame()
+            b = t.boards[0]
+            while b.playing and b.pieces_placed < 500:
+                # Replays the decision after every move, like a bot that's replanning after gravity would
+                best = None
+                for _ in range(4):
+                    start = time.perf_counter()
+                    best = bot.choose(b)
+                    decisions.append(time.perf_counter() - start)
+
+                for move in (best.path if best is not None else ()):
+                    b.get_function(move)()
+                if best is None or not b.update_grid():
+                    b.lose()
+            lines.append(b.lines)
+
+        print('Lookahead {}: {} decisions, {:.2f}ms average, {:.2f}ms worst'.format(
+            lookahead, len(decisions), 1000 * sum(decisions) / len(decisions), 1000 * max(decisions)))
+        print('    Transposition table: {} hits, {} misses, {:.0%} hit rate'.format(
+            bot.table.hits, bot.table.misses, bot.table.hit_rate))
+        print('    Searches that ran out of time: {}'.format(bot.timeouts))
+        print('    Lines per game: {}'.format(lines))
+
+        assert max(decisions) <= MOVE_BUDGET, "The worst decision took {:.2f}ms, over the {:.0f}ms budget".format(
+            1000 * max(decisions), 1000 * MOVE_BUDGET)
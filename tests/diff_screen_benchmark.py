@@ -0,0 +1,47 @@
+import time
+
+from tetris.classes import Tetris
+from display_util.diff_screen import DiffScreen
+
+
+class CountingScreen:
+    """A fake curses screen that counts how much gets written to it"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cells = 0
+
+    def addstr(self, y: int, x: int, string: str):
+        self.calls += 1
+        self.cells += len(string)
+
+    def refresh(self):
+        pass
+
+    def clear(self):
+        pass
+
+
+if __name__ == "__main__":
+    frames = 500
+
+    for diffed in (False, True):
+        t = Tetris(0, 0, 4, scale=2, seed=0, bots=True)
+        t.newgame()
+        terminal = CountingScreen()
+        screen = DiffScreen(terminal) if diffed else terminal
+
+        start = time.perf_counter()
+        for frame in range(frames):
+            # Something changes on roughly every tenth frame, like it would while the game is being played
+            if frame % 10 == 0:
+                for p in t.players:
+                    move = p.bot(p.board)
+                    if move is not None:
+                        p.get_function(move)()
+            t.add_to_screen(screen)
+            screen.refresh()
+        duration = time.perf_counter() - start
+
+        print('{}: {} addstr calls, {} cells written, {:.2f}ms per frame'.format(
+            'Diffed' if diffed else 'Direct', terminal.calls, terminal.cells, 1000 * duration / frames))
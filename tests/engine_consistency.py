@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+
+from tetris.engine import TetrisEngine, WALL_PADDING
+
+
+GAMES = 200
+
+
+def walked_ghost(board) -> tuple:
+    """Finds where the current piece would land by moving it down a row at a time until it collides"""
+    masks = board.current_piece.row_masks
+    x, y = board.piece_position()
+    if board.collides(masks, x, y):
+        return None
+    while not board.collides(masks, x, y + 1):
+        y += 1
+    return x, y
+
+
+def check_settled(board):
+    """Compares the incrementally kept column heights, filled counts, and row masks against a recount of the grid"""
+    occupied = board.settled != 0
+
+    heights = np.where(occupied.any(axis=1), board.height - occupied.argmax(axis=1), 0).tolist()
+    assert board.heights == heights, "Heights {} should be {}".format(board.heights, heights)
+
+    filled = occupied.sum(axis=1).tolist()
+    assert board.filled == filled, "Filled {} should be {}".format(board.filled, filled)
+
+    for r in range(board.height):
+        bits = sum(1 << (c + WALL_PADDING) for c in np.flatnonzero(occupied[:, r]))
+        assert board.rows[r] == board.wall_mask | bits, "Row {} doesn't match the grid".format(r)
+
+
+def check_ghost(board):
+    """Compares the ghost position, which takes the skirt and heights shortcut whenever it can, against a plain walk"""
+    if board.current_piece is not None:
+        ghost = board.ghost_position
+        walked = walked_ghost(board)
+        assert ghost == walked, "Ghost {} should be {}".format(ghost, walked)
+
+
+if __name__ == "__main__":
+    moves = random.Random(0)
+    locks = ghosts = 0
+
+    for seed in range(GAMES):
+        t = TetrisEngine(1, seed=seed)
+        t.newgame()
+        b = t.boards[0]
+
+        while t.playing:
+            placed = b.pieces_placed
+            if b.current_piece is not None:
+                [b.left, b.right, b.rotate, b.soft_drop, b.drop][moves.randrange(5)]()
+            t.step()
+
+            check_ghost(b)
+            ghosts += 1
+            if b.pieces_placed != placed:
+                check_settled(b)
+                locks += 1
+
+    print('{} games, {} locks and {} ghost positions matched the recount'.format(GAMES, locks, ghosts))
@@ -0,0 +1,24 @@
+import os
+
+from tetris.farm import GameFarm, GameSpec
+
+
+if __name__ == "__main__":
+    games = 2000
+    print('{} cores'.format(os.cpu_count()))
+
+    # Per worker throughput stays flat as long as adding workers scales, it drops once they start competing for cores
+    single = None
+    workers = 1
+    while workers <= os.cpu_count():
+        with GameFarm(workers) as farm:
+            results = list(farm.run(GameSpec(seed, policy='random') for seed in range(games)))
+            per_worker = farm.games_per_second / workers
+            if single is None:
+                single = per_worker
+            print('{} workers: {} games, {:.0f} games/sec, {:.0f} games/sec per worker ({:.0%} of one worker)'.format(
+                workers, len(results), farm.games_per_second, per_worker, per_worker / single))
+        workers *= 2
+
+    best = max(results, key=lambda r: max(r.score))
+    print('Best game: {}'.format(best))
@@ -7,7 +7,7 @@ pygame.init()
 
 if __name__ == "__main__":
     sticks = []
-    qs = gp.PygameEventReader.q
+    qs = gp.PygameEventReader.events
 
     for stick in gp.get_available():
         print(gp.display_gamepad_info(stick) + '\n')
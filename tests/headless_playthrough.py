@@ -0,0 +1,22 @@
+import random
+import time
+
+from tetris.engine import TetrisEngine
+
+
+if __name__ == "__main__":
+    games = 1000
+    moves = random.Random(0)
+
+    start = time.time()
+    for seed in range(games):
+        t = TetrisEngine(1, seed=seed)
+        t.newgame()
+        while t.playing:
+            for b in t.boards:
+                if b.current_piece is not None:
+                    [b.left, b.right, b.rotate, b.soft_drop][moves.randrange(4)]()
+            t.step()
+    duration = time.time() - start
+
+    print('{} games in {:.2f}s ({:.0f} games/sec)'.format(games, duration, games / duration))
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+
+def time_import(statement: str, runs: int = 5) -> tuple:
+    """Runs the statement in a fresh interpreter a few times, returns the fastest time in seconds,
+    and which of the heavy subsystems ended up being loaded"""
+    script = "import sys, time\n" \
+             "start = time.perf_counter()\n" \
+             "{}\n" \
+             "duration = time.perf_counter() - start\n" \
+             "print(duration, *[m for m in ('pygame', 'colorama', 'curses', 'multiprocessing.queues') " \
+             "if m in sys.modules])".format(statement)
+
+    best = None
+    loaded = []
+    for _ in range(runs):
+        # pygame prints a banner when it's imported, so only the last line is ours
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                check=True).stdout.splitlines()[-1].split()
+        duration = float(output[0])
+        if best is None or duration < best:
+            best = duration
+            loaded = output[1:]
+
+    return best, loaded
+
+
+EAGER = "import tetris.input.gamepad as gp\n" \
+        "gp.init_pygame()\n" \
+        "gp.PygameEventReader.events\n" \
+        "import colorama\n"
+"""Does everything that importing the game used to do up front, pygame, its joysticks, the event queues and colorama"""
+
+
+if __name__ == "__main__":
+    statements = {'tetris.engine': 'import tetris.engine',
+                  'tetris.classes': 'import tetris.classes',
+                  'main': 'import main'}
+
+    print('{:<16} {:>10} {:>10} {:>10}  loaded lazily'.format('Module', 'Lazy', 'Eager', 'Saved'))
+    for name, statement in statements.items():
+        lazy, loaded = time_import(statement)
+        eager, _ = time_import(EAGER + statement)
+        print('{:<16} {:>7.1f} ms {:>7.1f} ms {:>7.1f} ms  {}'.format(
+            name, lazy * 1000, eager * 1000, (eager - lazy) * 1000, ', '.join(loaded) or 'nothing heavy'))
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from tetris.classes import Tetris
+from tetris.async_runtime import AsyncRuntime
+from tetris.input.gamepad import PygameEventReader, init_pygame
+
+
+PRESSES = 200
+
+
+class NullScreen:
+    """A fake curses screen that throws away everything drawn to it"""
+
+    def addstr(self, y: int, x: int, string: str):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def press_buttons(pygame, stopping: threading.Event):
+    """Rotates the piece over and over by posting button presses straight onto the SDL queue"""
+    for _ in range(PRESSES):
+        for event_type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            pygame.event.post(pygame.event.Event(event_type, joy=0, instance_id=0, button=0))
+            time.sleep(0.01)
+    stopping.set()
+
+
+async def play(runtime: AsyncRuntime, stopping: threading.Event):
+    task = asyncio.ensure_future(runtime.run())
+    while not stopping.is_set():
+        await asyncio.sleep(0.1)
+    runtime.stop()
+    await task
+
+
+if __name__ == "__main__":
+    pygame = init_pygame()
+
+    # The reader runs on a thread so that it shares this process's SDL queue
+    reader = PygameEventReader(event_driven=True)
+    reading = threading.Thread(target=reader.run, daemon=True)
+    reading.start()
+
+    t = Tetris(0, 0, 1, seed=0)
+    t.players[0].joystick = 0
+    runtime = AsyncRuntime(t, NullScreen(), PygameEventReader.events)
+
+    stopping = threading.Event()
+    threading.Thread(target=press_buttons, args=(pygame, stopping), daemon=True).start()
+    asyncio.run(play(runtime, stopping))
+    reader.stop_q.put(True)
+    reading.join()
+
+    print(runtime.latency.report())
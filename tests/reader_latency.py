@@ -0,0 +1,49 @@
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from tetris.input.gamepad import PygameEventReader, init_pygame
+
+
+PRESSES = 200
+
+
+def measure(event_driven: bool) -> list:
+    """Posts button presses straight onto the SDL queue and times how long each takes to come out of the reader's queue,
+    the reader is run on a thread in this process so that it shares the same SDL queue"""
+    pygame = init_pygame()
+    reader = PygameEventReader(0.01, event_driven=event_driven)
+    thread = threading.Thread(target=reader.run, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+
+    latencies = []
+    for i in range(PRESSES):
+        for event_type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            start = time.perf_counter()
+            pygame.event.post(pygame.event.Event(event_type, joy=0, instance_id=0, button=i % 8))
+            PygameEventReader.events.get(timeout=1)
+            latencies.append(time.perf_counter() - start)
+        time.sleep(0.003)
+
+    reader.stop_q.put(True)
+    thread.join()
+    reader.stop_q.get()
+    return latencies
+
+
+if __name__ == '__main__':
+    for event_driven in (False, True):
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        latencies = measure(event_driven)
+        usage = (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+        latencies.sort()
+        print('{:>12}: median {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms, {:.0f}% cpu'.format(
+            'event driven' if event_driven else 'polling',
+            statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99)] * 1000,
+            latencies[-1] * 1000, usage * 100))
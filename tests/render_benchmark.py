@@ -0,0 +1,24 @@
+import time
+
+from tetris.classes import Tetris
+
+
+if __name__ == "__main__":
+    frames = 2000
+
+    t = Tetris(0, 0, 4, scale=2, seed=0)
+    t.newgame()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for b in t.boards:
+            b.get_board_string()
+    boards = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        str(t)
+    whole = time.perf_counter() - start
+
+    print('4 boards at scale 2: {:.1f}us per frame'.format(1e6 * boards / frames))
+    print('Whole display: {:.1f}us per frame'.format(1e6 * whole / frames))
@@ -0,0 +1,49 @@
+import time
+
+from tetris.classes import Tetris
+from tetris.replay import Replay, play_replay, game_state
+
+
+GAMES = 20
+MAX_PIECES = 300
+
+
+def record_game(seed: int) -> Tetris:
+    """Plays a bot game with recording on, gravity is forced every few moves instead of waiting for it"""
+    t = Tetris(0, 0, 2, seed=seed, bots=True, record=True)
+    t.newgame()
+    for p in t.players:
+        p.move_delay = 0
+
+    moves = 0
+    while t.playing and all(b.pieces_placed < MAX_PIECES for b in t.boards):
+        for p in t.players:
+            p.update()
+        moves += 1
+        if moves % 3 == 0:
+            for b in t.boards:
+                b.time_start -= b.delay
+                b.update()
+    return t
+
+
+if __name__ == "__main__":
+    replays = []
+    for seed in range(GAMES):
+        t = record_game(seed)
+        data = t.recorder.replay.to_bytes()
+        replay = Replay.from_bytes(data)
+        assert replay.actions == t.recorder.replay.actions
+        assert game_state(play_replay(replay)) == game_state(t), "Game {} played back differently".format(seed)
+        replays.append((replay, len(data)))
+
+    actions = sum(len(r) for r, _ in replays)
+    size = sum(n for _, n in replays)
+    print('{} games, {} actions, {} bytes ({:.2f} bytes per action), every final state matched'.format(
+        GAMES, actions, size, size / actions))
+
+    start = time.perf_counter()
+    for r, _ in replays:
+        play_replay(r)
+    duration = time.perf_counter() - start
+    print('Played back in {:.2f}s, {:.0f} actions/sec'.format(duration, actions / duration))
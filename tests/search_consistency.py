@@ -0,0 +1,89 @@
+import random
+from collections import deque
+
+from tetris.engine import TetrisEngine
+from tetris.pieces import ROW_MASKS
+from tetris.search import find_placements
+from tetris.shared import KeyMappings
+
+
+GAMES = 30
+
+
+def exhaustive_resting(board) -> set:
+    """Finds every (x, y, rotation) the current piece can come to rest at by walking every position it can reach
+    with the engine's own collision check, instead of the search's fit tables"""
+    piece = board.current_piece
+    masks = ROW_MASKS[piece.num]
+    x, y = board.piece_position()
+
+    start = (x, y, piece.rotation)
+    if board.collides(masks[piece.rotation], x, y):
+        return set()
+
+    seen = {start}
+    queue = deque([start])
+    resting = set()
+    while queue:
+        x, y, r = queue.popleft()
+        for child in ((x - 1, y, r), (x + 1, y, r), (x, y + 1, r), (x, y, (r + 1) % len(masks))):
+            cx, cy, cr = child
+            if child not in seen and not board.collides(masks[cr], cx, cy):
+                seen.add(child)
+                queue.append(child)
+        if board.collides(masks[r], x, y + 1):
+            resting.add((x, y, r))
+
+    return resting
+
+
+def check_path(board, placement):
+    """Plays the placement's path out on the board, everything but the final drop has to move the piece,
+    and the drop has to land it where the placement says, the piece is put back afterwards"""
+    piece = board.current_piece
+    saved = (piece.offset, piece.rotation, board.piece_hash)
+
+    assert placement.path[-1] == KeyMappings.DROP, "{} doesn't end with a drop".format(placement)
+    for move in placement.path[:-1]:
+        moved = {KeyMappings.SHIFT_LEFT: board.left, KeyMappings.SHIFT_RIGHT: board.right,
+                 KeyMappings.ROTATE: board.rotate, KeyMappings.SOFT_DROP: board.descend}[move]()
+        assert moved, "{} is blocked on the way to {}".format(move.name, placement)
+
+    landed = board.ghost_position + (piece.rotation,)
+    assert landed == (placement.x, placement.y, placement.rotation), \
+        "{} lands at {} instead".format(placement, landed)
+
+    piece.offset, piece.rotation, board.piece_hash = saved
+
+
+if __name__ == "__main__":
+    moves = random.Random(0)
+    pieces = placements = 0
+
+    for seed in range(GAMES):
+        t = TetrisEngine(1, seed=seed)
+        t.newgame()
+        b = t.boards[0]
+
+        placed = -1
+        while t.playing:
+            if b.current_piece is not None and b.pieces_placed != placed:
+                placed = b.pieces_placed
+
+                found = find_placements(b)
+                positions = [(p.x, p.y, p.rotation) for p in found]
+                assert len(positions) == len(set(positions)), "Placements are repeated"
+                assert set(positions) == exhaustive_resting(b), "Seed {} piece {} has different placements".format(
+                    seed, placed)
+
+                for p in found:
+                    check_path(b, p)
+                pieces += 1
+                placements += len(found)
+
+            if b.current_piece is not None:
+                [b.left, b.right, b.rotate, b.soft_drop, b.drop][moves.randrange(5)]()
+            t.step()
+
+    print('{} pieces, {} placements matched the exhaustive search and their paths land where they say'.format(
+        pieces, placements))
@@ -0,0 +1,58 @@
+import time
+from multiprocessing import Process, Queue
+
+from tetris.input.gamepad import GamePadEvent, GamePadEventType, GamePadButtonEventData, GamePadHatEventData, \
+    HatPositionType
+from tetris.input.transport import EventBatcher, EventReceiver
+
+
+CYCLES = 2000
+EVENTS_PER_CYCLE = 8
+
+
+def mashing_events() -> list:
+    """One poll cycle's worth of a player mashing buttons and rocking the hat back and forth"""
+    events = []
+    for i in range(EVENTS_PER_CYCLE // 4):
+        events.append(GamePadEvent(GamePadEventType.BUTTON, 0, GamePadButtonEventData(0, True)))
+        events.append(GamePadEvent(GamePadEventType.BUTTON, 0, GamePadButtonEventData(0, False)))
+        events.append(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, 0,
+                                   GamePadHatEventData(0, HatPositionType.NOT_PRESSED, False)))
+        events.append(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, 0,
+                                   GamePadHatEventData(0, HatPositionType.LEFT, True)))
+    return events
+
+
+def send_each(q: Queue):
+    events = mashing_events()
+    for _ in range(CYCLES):
+        for e in events:
+            q.put(e)
+
+
+def send_batched(q: Queue):
+    events = mashing_events()
+    batch = EventBatcher(q)
+    for _ in range(CYCLES):
+        for e in events:
+            batch.add(e)
+        batch.flush()
+
+
+if __name__ == "__main__":
+    total = CYCLES * EVENTS_PER_CYCLE
+
+    q = Queue()
+    start = time.perf_counter()
+    Process(target=send_each, args=(q,)).start()
+    for _ in range(total):
+        q.get()
+    print('One put per event: {:.0f} events/sec'.format(total / (time.perf_counter() - start)))
+
+    receiver = EventReceiver(Queue())
+    start = time.perf_counter()
+    Process(target=send_batched, args=(receiver.queue,)).start()
+    received = 0
+    while received < total:
+        received += len(receiver.drain(1))
+    print('Batched records: {:.0f} events/sec'.format(total / (time.perf_counter() - start)))
@@ -0,0 +1,244 @@
+import asyncio
+import time
+
+from display_util.diff_screen import DiffScreen
+from display_util.menu import add_multiline_string
+from display_util.string_display_util import boxed_text
+from .classes import Tetris, BotPlayer
+from .input.gamepad import GamePadEventType
+from .input.latency import InputLatency
+
+
+PAUSE_BUTTON = 9
+"""The gamepad button that pauses and resumes the game"""
+
+
+class AsyncRuntime:
+    """Runs a game of Tetris on an asyncio event loop, the gravity of each board, each bot, the input, and the rendering
+    are all separate coroutines that sleep until their own next deadline, so one process can host any number of games
+    side by side without threads or polling.
+
+    screen can be left as None to play without a display, and event_queue as None to play without any input,
+    event_queue is an EventReceiver like PygameEventReader.events, the runtime doesn't start the reader process itself.
+    latency times each input from its capture to the frame that shows it."""
+
+    def __init__(self, game: Tetris, screen=None, event_queue=None, frame_cap: int = 30, countdown: int = 0):
+        self.game = game
+        self.screen = screen if screen is None or isinstance(screen, DiffScreen) else DiffScreen(screen)
+        self.event_queue = event_queue
+        self.frame_interval = 1 / frame_cap
+        self.countdown_length = countdown
+        self.latency = InputLatency()
+
+        self.stopping = False
+        self.paused_at = None
+        self.unpaused = None
+        self.changed = None
+        self.pressed = None
+
+    def stop(self):
+        """Ends the game at the next opportunity, every coroutine of it returns"""
+        self.stopping = True
+        if self.unpaused is not None:
+            self.unpaused.set()
+            self.changed.set()
+            self.pressed.set()
+
+    # region Pausing
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_at is not None
+
+    def pause(self):
+        """Stops the gravity and the bots until resume is called"""
+        if not self.paused:
+            self.paused_at = time.monotonic()
+            self.unpaused.clear()
+
+            if self.screen is not None:
+                self.draw_pause()
+
+    def draw_pause(self):
+        """Draws the pause box over the middle of the game"""
+        pause_string = boxed_text("Paused!\nPress any key to continue...")
+        x, y = self.game.display_midpoint
+        add_multiline_string(pause_string, self.screen, x - 14, y - 2)
+
+    def resume(self):
+        """Restarts the gravity and the bots, the time spent paused doesn't count against any of their timers"""
+        if self.paused:
+            self.game.resume(time.monotonic() - self.paused_at)
+
+            self.paused_at = None
+            self.unpaused.set()
+            self.changed.set()
+
+    # endregion
+
+    # region Coroutines
+
+    async def gravity(self, board):
+        """Moves the board's piece down each time its delay runs out, until the board's game is over"""
+        while board.playing and not self.stopping:
+            await self.unpaused.wait()
+
+            remaining = board.time_start + board.delay - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+
+            board.update()
+            self.changed.set()
+
+    async def bot(self, player: BotPlayer):
+        """Makes the bot's moves, waiting the bot's move delay in between each of them"""
+        board = player.board
+        while board.playing and not self.stopping:
+            await self.unpaused.wait()
+
+            remaining = player.time_last_move + player.move_delay - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+
+            player.update()
+            self.changed.set()
+
+    async def auto_repeat(self):
+        """Repeats the commands that the human players are holding down, sleeping until the next one is due,
+        or until another event arrives if nothing is held"""
+        players = [p for p in self.game.players if not isinstance(p, BotPlayer)]
+        while not self.stopping:
+            await self.unpaused.wait()
+            self.pressed.clear()
+
+            due = [p.next_repeat for p in players if p.next_repeat is not None]
+            if not due:
+                await self.pressed.wait()
+                continue
+
+            remaining = min(due) - time.monotonic()
+            if remaining > 0:
+                # A new press or release can change what's due next
+                try:
+                    await asyncio.wait_for(self.pressed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for p in players:
+                p.update()
+            self.changed.set()
+
+    async def render(self):
+        """Redraws the screen whenever something has changed, at most once per frame interval"""
+        while not self.stopping:
+            await self.changed.wait()
+            self.changed.clear()
+
+            # The boards would otherwise be drawn straight over the pause box
+            self.game.add_to_screen(self.screen)
+            if self.paused:
+                self.draw_pause()
+            self.screen.refresh()
+            self.latency.painted()
+
+            await asyncio.sleep(self.frame_interval)
+
+    async def read_input(self):
+        """Handles gamepad events as they arrive on the event queue, a whole batch at a time.
+
+        The loop is woken up by the queue's pipe becoming readable, on event loops that can't watch pipes the queue
+        is checked once per frame instead"""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        fileno = self.event_queue.fileno()
+        try:
+            loop.add_reader(fileno, ready.set)
+            watching = True
+        except NotImplementedError:
+            watching = False
+
+        try:
+            while not self.stopping:
+                if watching:
+                    await ready.wait()
+                    ready.clear()
+                else:
+                    await asyncio.sleep(self.frame_interval)
+
+                for event, captured in self.event_queue.drain_timed():
+                    self.latency.dequeued(captured)
+                    self.handle_event(event, captured)
+        finally:
+            if watching:
+                loop.remove_reader(fileno)
+
+    def handle_event(self, event, captured: float = None):
+        """Pauses or resumes the game for the pause button, and otherwise passes the event on to the players,
+        captured is when the event was captured, for timing it"""
+        if event.event_type == GamePadEventType.BUTTON and event.data.button == PAUSE_BUTTON and not event.data.status:
+            if self.paused:
+                self.resume()
+            else:
+                self.pause()
+        elif not self.paused:
+            if self.game.dispatch(event) and captured is not None:
+                self.latency.applied(captured)
+            self.pressed.set()
+
+        self.changed.set()
+
+    async def countdown(self, seconds: int):
+        """Counts down on each player's board while showing what the starting piece will be"""
+        for i in range(seconds, 0, -1):
+            self.game.add_countdown_to_screen(self.screen, i)
+            self.screen.refresh()
+            await asyncio.sleep(1)
+
+    # endregion
+
+    async def run(self) -> Tetris:
+        """Plays a new game until every board is over, or stop is called, and returns the game"""
+        self.stopping = False
+        self.paused_at = None
+        self.unpaused = asyncio.Event()
+        self.unpaused.set()
+        self.changed = asyncio.Event()
+        self.pressed = asyncio.Event()
+
+        game = self.game
+        game.newgame()
+
+        if self.screen is not None and self.countdown_length:
+            start = time.monotonic()
+            await self.countdown(self.countdown_length)
+
+            # Nobody gets to move during the countdown, so it's the same as being paused
+            game.resume(time.monotonic() - start)
+
+        players = [asyncio.ensure_future(self.gravity(b)) for b in game.boards]
+        players += [asyncio.ensure_future(self.bot(p)) for p in game.players if isinstance(p, BotPlayer)]
+
+        background = []
+        if self.screen is not None:
+            background.append(asyncio.ensure_future(self.render()))
+        if self.event_queue is not None:
+            background.append(asyncio.ensure_future(self.read_input()))
+            background.append(asyncio.ensure_future(self.auto_repeat()))
+
+        try:
+            await asyncio.gather(*players)
+        finally:
+            self.stop()
+            for task in players + background:
+                task.cancel()
+            await asyncio.gather(*players, *background, return_exceptions=True)
+
+            if self.screen is not None:
+                game.add_to_screen(self.screen)
+                self.screen.refresh()
+
+        return game
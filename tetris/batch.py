@@ -0,0 +1,241 @@
+import numpy as np
+
+from .shared import KeyMappings, iteration_delay
+from .pieces import BLOCK_TYPES, CELLS
+
+
+NO_ACTION = -1
+"""Action value for boards that shouldn't do anything this step, the other actions are the KeyMappings values"""
+
+LINE_POINTS = np.array([0, 40, 100, 300, 1200], dtype=np.int64)
+"""Base number of points awarded for clearing 0-4 lines at once, multiplied by the level + 1, as in get_score_points"""
+
+ROTATION_COUNTS = np.array([block_type.max_rotation for block_type in BLOCK_TYPES], dtype=np.int8)
+
+PIECE_CELLS = np.array([[CELLS[n][r % len(CELLS[n])] for r in range(4)] for n in range(len(BLOCK_TYPES))],
+                       dtype=np.int16)
+"""Contains the (row, column) cells of every piece and rotation, shape (pieces, 4 rotations, 4 cells, 2),
+pieces with fewer than 4 rotations repeat their shapes to fill the table"""
+
+PIECE_CELLS.flags.writeable = False
+
+BATCH_DTYPE = np.dtype([('piece', np.int8),
+                        ('rotation', np.int8),
+                        ('x', np.int16),
+                        ('y', np.int16),
+                        ('next_piece', np.int8),
+                        ('score', np.int64),
+                        ('lines', np.int32),
+                        ('level', np.int32),
+                        ('pieces_placed', np.int32),
+                        ('playing', np.bool_)])
+"""The per-board metadata kept by BatchEngine, x and y are the offset of the current piece relative to the board"""
+
+
+def clear_full_rows(grids: np.ndarray) -> np.ndarray:
+    """Removes every full row from a stack of (boards, height, width) grids in place, moving the rows above them down,
+    returns the number of rows cleared on each board"""
+    full = np.all(grids != 0, axis=2)
+    counts = full.sum(axis=1)
+
+    cleared = np.flatnonzero(counts)
+    if len(cleared):
+        # A stable sort on "isn't full" puts the full rows at the top and keeps the rest in order below them,
+        # the full rows then only need to be emptied
+        order = np.argsort(~full[cleared], axis=1, kind='stable')
+        compacted = np.take_along_axis(grids[cleared], order[:, :, np.newaxis], axis=1)
+        compacted[np.arange(grids.shape[1]) < counts[cleared, np.newaxis]] = 0
+        grids[cleared] = compacted
+
+    return counts
+
+
+class BatchEngine:
+    """Simulates many boards in lockstep, the settled cells of every board are kept in one (boards, height, width)
+    array and the rest of their state in a structured array, so that a whole vector of actions is applied at once.
+
+    Follows the same rules as BoardEngine, pieces spawn at (4, 1), and cells contain the piece's num + 1."""
+
+    def __init__(self, num_boards: int, width: int = 10, height: int = 20, seed: int = None):
+        self.num_boards = num_boards
+        self.width = width
+        self.height = height
+        self.seed = seed
+
+        self.random = np.random.default_rng(seed)
+        self.grids = np.zeros(shape=(num_boards, height, width), dtype=np.int8)
+        self.state = np.zeros(num_boards, dtype=BATCH_DTYPE)
+
+        self.reset()
+
+    def reset(self):
+        """Clears every board and puts a new piece on each of them"""
+        self.random = np.random.default_rng(self.seed)
+        self.grids[:] = 0
+        self.state[:] = 0
+        self.state['level'] = 1
+        self.state['playing'] = True
+        self.state['next_piece'] = self.random.integers(0, len(BLOCK_TYPES), self.num_boards)
+
+        self.__spawn(np.arange(self.num_boards))
+
+    @property
+    def playing(self) -> np.ndarray:
+        """Returns a boolean array of which boards are still playing"""
+        return self.state['playing']
+
+    @property
+    def delays(self) -> np.ndarray:
+        """Returns the gravity delay, in seconds, that each board's level would have in a real-time game"""
+        return np.array([iteration_delay(level) for level in self.state['level']])
+
+    def get_grid(self, index: int) -> np.ndarray:
+        """Returns a (width, height) grid for one of the boards with its current piece overlaid,
+        laid out the same way as BoardEngine.grid"""
+        result = self.grids[index].T.copy()
+        s = self.state[index]
+
+        if s['playing']:
+            rows, cols = self.__cells(np.array([index]))
+            inside = (rows >= 0) & (rows < self.height)
+            result[cols[inside], rows[inside]] = s['piece'] + 1
+
+        return result
+
+    # region Collisions
+
+    def __cells(self, boards: np.ndarray, dx: int = 0, dy: int = 0, rotation: np.ndarray = None) -> tuple:
+        """Returns the (rows, columns) board coordinates of the current piece's cells on each of the given boards,
+        each with shape (boards, 4), after moving it by (dx, dy) and giving it the new rotation, if any"""
+        s = self.state[boards]
+        cells = PIECE_CELLS[s['piece'], s['rotation'] if rotation is None else rotation]
+        rows = cells[:, :, 0] + (s['y'] + dy)[:, np.newaxis]
+        cols = cells[:, :, 1] + (s['x'] + dx)[:, np.newaxis]
+        return rows, cols
+
+    def __fits(self, boards: np.ndarray, dx: int = 0, dy: int = 0, rotation: np.ndarray = None) -> np.ndarray:
+        """Determines which of the given boards could have their current piece moved by (dx, dy) and given the new
+        rotation, if any, without overlapping the walls, the floor, or the settled cells"""
+        rows, cols = self.__cells(boards, dx, dy, rotation)
+
+        inside = (cols >= 0) & (cols < self.width) & (rows < self.height)
+        occupied = self.grids[boards[:, np.newaxis], np.clip(rows, 0, self.height - 1),
+                              np.clip(cols, 0, self.width - 1)] != 0
+
+        # Rows above the top of the board are only bounded by the walls
+        return np.all(inside & ((rows < 0) | ~occupied), axis=1)
+
+    # endregion
+
+    # region Pieces
+
+    def __spawn(self, boards: np.ndarray):
+        """Puts each of the given boards' next piece into play, and draws a new next piece for them,
+        boards whose new piece doesn't fit are lost"""
+        if len(boards) == 0:
+            return
+
+        self.state['piece'][boards] = self.state['next_piece'][boards]
+        self.state['next_piece'][boards] = self.random.integers(0, len(BLOCK_TYPES), len(boards))
+        self.state['rotation'][boards] = 0
+        self.state['x'][boards] = 4
+        self.state['y'][boards] = 1
+
+        self.state['playing'][boards[~self.__fits(boards)]] = False
+
+    def __lock(self, boards: np.ndarray, dropped_grids: np.ndarray = None):
+        """Freezes the current piece of each of the given boards, clears any lines they completed, updates the score
+        and level, then spawns their next piece"""
+        if len(boards) == 0:
+            return
+
+        rows, cols = self.__cells(boards)
+        self.grids[boards[:, np.newaxis], rows, cols] = (self.state['piece'][boards] + 1)[:, np.newaxis]
+        self.state['pieces_placed'][boards] += 1
+
+        grids = self.grids[boards]
+        cleared = clear_full_rows(grids)
+        self.grids[boards] = grids
+
+        level = self.state['level'][boards]
+        points = LINE_POINTS[cleared] * (level + 1)
+        if dropped_grids is not None:
+            points += dropped_grids
+        self.state['score'][boards] += points
+
+        lines = self.state['lines'][boards] + cleared
+        self.state['lines'][boards] = lines
+        self.state['level'][boards] = lines // 10 + 1
+
+        self.__spawn(boards)
+
+    # endregion
+
+    # region Actions
+
+    def __shift(self, boards: np.ndarray, dx: int):
+        """Shifts the current piece of each of the given boards by dx columns, where there's room"""
+        moved = boards[self.__fits(boards, dx=dx)]
+        self.state['x'][moved] += dx
+
+    def __rotate(self, boards: np.ndarray):
+        """Rotates the current piece of each of the given boards, where there's room"""
+        s = self.state[boards]
+        rotation = (s['rotation'] + 1) % ROTATION_COUNTS[s['piece']]
+        fits = self.__fits(boards, rotation=rotation)
+        self.state['rotation'][boards[fits]] = rotation[fits]
+
+    def __descend(self, boards: np.ndarray, points: int = 0):
+        """Moves the current piece of each of the given boards down a row, awarding the given points for it,
+        pieces that can't go any further are locked in place"""
+        fits = self.__fits(boards, dy=1)
+        moved = boards[fits]
+        self.state['y'][moved] += 1
+        self.state['score'][moved] += points
+
+        self.__lock(boards[~fits])
+
+    def __drop(self, boards: np.ndarray):
+        """Drops the current piece of each of the given boards as far as it can go and locks it in place"""
+        distances = np.zeros(len(boards), dtype=np.int64)
+
+        falling = np.arange(len(boards))
+        while len(falling):
+            falling = falling[self.__fits(boards[falling], dy=1)]
+            self.state['y'][boards[falling]] += 1
+            distances[falling] += 1
+
+        self.__lock(boards, 2 * distances)
+
+    def apply(self, actions: np.ndarray):
+        """Applies one action to each board, actions contains a KeyMappings value, or NO_ACTION, for every board"""
+        actions = np.asarray(actions)
+        playing = self.state['playing']
+
+        for mapping in KeyMappings:
+            boards = np.flatnonzero((actions == mapping.value) & playing)
+            if len(boards) == 0:
+                continue
+
+            if mapping == KeyMappings.SHIFT_LEFT:
+                self.__shift(boards, -1)
+            elif mapping == KeyMappings.SHIFT_RIGHT:
+                self.__shift(boards, 1)
+            elif mapping == KeyMappings.ROTATE:
+                self.__rotate(boards)
+            elif mapping == KeyMappings.SOFT_DROP:
+                self.__descend(boards, 1)
+            elif mapping == KeyMappings.DROP:
+                self.__drop(boards)
+
+    def gravity(self):
+        """Moves every playing board's current piece down a row, locking the ones that can't go any further"""
+        self.__descend(np.flatnonzero(self.state['playing']))
+
+    def step(self, actions: np.ndarray = None):
+        """Applies a vector of actions, if given, and then one gravity interval, to every board"""
+        if actions is not None:
+            self.apply(actions)
+        self.gravity()
+
+    # endregion
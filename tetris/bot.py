@@ -0,0 +1,189 @@
+import time
+
+import numpy as np
+
+from .batch import PIECE_CELLS, clear_full_rows
+from .search import search_placements
+from .shared import KeyMappings
+from .zobrist import TranspositionTable
+
+
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+"""Weights for the aggregate height, completed lines, holes, and bumpiness features, in that order,
+these are the well known ones tuned by Yiyuan Lee"""
+
+DECISION_BUDGET = 0.02
+"""Default number of seconds a lookahead search gets to choose a placement, less than half the time a piece gets
+between gravity steps at level 10, past it the bot settles for the best placement without looking ahead"""
+
+SPAWN_POSITION = (4, 1)
+"""Where BoardEngine puts each new piece, relative to the board, for working out where upcoming pieces can go"""
+
+
+def placement_grids(occupied: np.ndarray, placements: list) -> tuple:
+    """Builds the board that each placement would leave behind from an array of shape (height, width) that's True
+    wherever a cell is filled, returns a (placements, height, width) stack of them with the full rows already cleared,
+    and the number of rows each placement cleared"""
+    count = len(placements)
+
+    nums = np.fromiter((p.num for p in placements), dtype=np.int64, count=count)
+    rotations = np.fromiter((p.rotation for p in placements), dtype=np.int64, count=count)
+    xs = np.fromiter((p.x for p in placements), dtype=np.int64, count=count)
+    ys = np.fromiter((p.y for p in placements), dtype=np.int64, count=count)
+
+    cells = PIECE_CELLS[nums, rotations]
+    rows = cells[:, :, 0] + ys[:, np.newaxis]
+    cols = cells[:, :, 1] + xs[:, np.newaxis]
+
+    grids = np.repeat(occupied[np.newaxis], count, axis=0)
+    grids[np.arange(count)[:, np.newaxis], rows, cols] = True
+
+    return grids, clear_full_rows(grids)
+
+
+def grid_features(grids: np.ndarray, lines: np.ndarray) -> np.ndarray:
+    """Measures a (boards, height, width) stack of grids, returns an array of shape (boards, 4) containing
+    the aggregate height, completed lines, holes, and bumpiness of each of them"""
+    height = grids.shape[1]
+
+    occupied = grids.any(axis=1)
+    heights = np.where(occupied, height - grids.argmax(axis=1), 0)
+    holes = heights.sum(axis=1) - grids.sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+
+    return np.stack((heights.sum(axis=1), lines, holes, bumpiness), axis=1)
+
+
+def placement_features(settled: np.ndarray, placements: list) -> np.ndarray:
+    """Scores the board that each placement would leave behind, returns an array of shape (placements, 4) containing
+    the aggregate height, completed lines, holes, and bumpiness of each resulting board.
+
+    Every candidate board is built and measured at once as a (placements, height, width) stack, lines are cleared
+    before the other features are measured."""
+    return grid_features(*placement_grids(settled.T != 0, placements))
+
+
+class SearchTimeout(Exception):
+    """Raised inside a lookahead search once it's gone over its budget"""
+
+
+class HeuristicBot:
+    """A computer player that places each piece wherever the weighted sum of the placement_features is highest.
+
+    Calling it with a board returns the next move to make, or None if there isn't anything to do, the plan is
+    redone whenever the piece isn't where the last move should have left it, like after gravity moves it down.
+
+    With a lookahead, each placement is scored by the best that the next lookahead pieces can do after it instead.
+    Positions are cached in a TranspositionTable by their Zobrist hash, so replanning, and boards that come up again
+    further down the search, don't get searched twice.
+
+    A lookahead search that takes longer than budget seconds is abandoned, and the piece is placed without looking
+    ahead instead, timeouts counts how often that happened. Everything the search finished is still cached."""
+
+    def __init__(self, weights: tuple = DEFAULT_WEIGHTS, lookahead: int = 0, table: TranspositionTable = None,
+                 budget: float = DECISION_BUDGET):
+        self.weights = np.array(weights, dtype=float)
+        self.lookahead = lookahead
+        self.table = table if table is not None else TranspositionTable()
+        self.budget = budget
+        self.deadline = None
+        self.timeouts = 0
+        self.path = []
+        self.expected = None
+
+    def choose(self, board):
+        """Returns the best Placement for the board's current piece, or None if it can't go anywhere"""
+        piece = board.current_piece
+        if piece is None:
+            return None
+
+        keys = board.zobrist_keys
+        upcoming = board.next_pieces(self.lookahead) if self.lookahead else ()
+        x, y = board.piece_position()
+        occupied = board.settled.T != 0
+
+        if upcoming and self.budget is not None:
+            self.deadline = time.perf_counter() + self.budget
+        try:
+            _, best = self.__evaluate(board.zobrist ^ keys.pieces(upcoming), occupied, board.settled_hash,
+                                      piece.num, piece.rotation, x, y, upcoming, keys)
+        except SearchTimeout:
+            self.timeouts += 1
+            _, best = self.__evaluate(board.zobrist, occupied, board.settled_hash,
+                                      piece.num, piece.rotation, x, y, (), keys)
+        finally:
+            self.deadline = None
+
+        return best
+
+    def __evaluate(self, key: int, occupied: np.ndarray, settled_hash: int, num: int, rotation: int, x: int, y: int,
+                   upcoming: tuple, keys) -> tuple:
+        """Finds the best placement for a piece starting at (x, y) and rotation on the board whose filled cells are
+        occupied, looking ahead through the upcoming pieces, returns the placement along with its score"""
+        entry = self.table.get(key)
+        if entry is not None:
+            return entry
+
+        placements = search_placements(occupied.T, num, rotation, x, y)
+        if not placements:
+            entry = (float('-inf'), None)
+            self.table.put(key, entry)
+            return entry
+
+        grids, lines = placement_grids(occupied, placements)
+        scores = grid_features(grids, lines) @ self.weights
+
+        if upcoming:
+            next_num = upcoming[0]
+            rest = upcoming[1:]
+            spawn_x, spawn_y = SPAWN_POSITION
+            next_key = keys.piece(next_num, 0, spawn_x, spawn_y) ^ keys.pieces(rest)
+
+            for k, p in enumerate(placements):
+                if self.deadline is not None and time.perf_counter() > self.deadline:
+                    raise SearchTimeout()
+
+                if lines[k]:
+                    child_hash = keys.grid(grids[k])
+                else:
+                    child_hash = settled_hash
+                    for r, c in p.cells:
+                        child_hash ^= keys.cells[r][c]
+
+                child, _ = self.__evaluate(child_hash ^ next_key, grids[k], child_hash,
+                                           next_num, 0, spawn_x, spawn_y, rest, keys)
+                scores[k] = self.weights[1] * lines[k] + child
+
+        best = int(np.argmax(scores))
+        entry = (float(scores[best]), placements[best])
+        self.table.put(key, entry)
+        return entry
+
+    def __piece_state(self, board) -> tuple:
+        """Returns the (num, rotation, x, y) of the board's current piece"""
+        x, y = board.piece_position()
+        return board.current_piece.num, board.current_piece.rotation, x, y
+
+    def __call__(self, board) -> KeyMappings:
+        if board.current_piece is None or not board.playing:
+            return None
+
+        state = self.__piece_state(board)
+        if not self.path or state != self.expected:
+            best = self.choose(board)
+            self.path = list(best.path) if best is not None else [KeyMappings.DROP]
+
+        move = self.path.pop(0)
+
+        num, rotation, x, y = state
+        if move == KeyMappings.SHIFT_LEFT:
+            x -= 1
+        elif move == KeyMappings.SHIFT_RIGHT:
+            x += 1
+        elif move == KeyMappings.ROTATE:
+            rotation = (rotation + 1) % board.current_piece.max_rotation
+        elif move == KeyMappings.SOFT_DROP:
+            y += 1
+        self.expected = (num, rotation, x, y)
+
+        return move
@@ -1,171 +1,147 @@
-import numpy as np
 import json
 import random
 import time
+import numpy as np
 from copy import deepcopy
-import pygame
+from functools import partial
 
-from display_util.string_display_util import boxed_text, hstack, control_arrows
+from display_util.string_display_util import boxed_text, hstack, control_arrows, aligned_text
 from display_util.menu import add_multiline_string
-from .shared import int_to_block, KeyMappings, iteration_delay
-from .input.gamepad import GamePadButtonEventData, GamePadHatEventData, HatPositionType, GamePadEventData
-
-
-pygame.init()
-if not pygame.joystick.get_init():
-    pygame.joystick.init()
-
-pgj = pygame.joystick
-
-
-class Board:
-    """Contains a numpy array that holds the blocks for the game, contains methods for descent, dropping, and moving."""
-
-    def __init__(self, pos_x: int, pos_y: int, piece_callback, width: int = 10, height: int = 20, scale: int = 1):
-        self.offset = (pos_x, pos_y)
-        self.scale = scale
-        self.width = width
-        self.width_total = width * scale
-        self.height = height
-        self.height_total = height * scale
-        self.pieces = []
-        self.current_piece = None
-        self.grid = np.zeros(shape=(width, height), dtype=int)
-        self.background_char = '\u2591'
-        self.read_for_piece = True
-        self.piece_callback = piece_callback
-
-        self.level = 1
-        self.lines = 0
-        self.score = 0
-
-        self.delay = iteration_delay(self.level)
-        self.time_start = time.time()
+from .shared import int_to_block, KeyMappings
+from .pieces import BLOCK_TYPES
+from .engine import BoardEngine, TetrisEngine
+from .layout import DisplayLayout
+from .bot import HeuristicBot
+from .replay import ReplayRecorder, GRAVITY, LOSE
+from .input.gamepad import GamePadButtonEventData, GamePadHatEventData, HatPositionType, GamePadEventData, \
+    joystick_count
 
-        self.playing = True
 
-    def reset(self):
-        self.pieces = []
-        self.current_piece = None
-        self.grid = np.zeros(shape=(self.width, self.height), dtype=int)
-
-        self.read_for_piece = True
+_glyph_tables = {}
 
-        self.level = 1
-        self.lines = 0
-        self.score = 0
+REPEATING_MAPPINGS = frozenset((KeyMappings.SHIFT_LEFT, KeyMappings.SHIFT_RIGHT, KeyMappings.SOFT_DROP))
+"""The commands that keep repeating for as long as their button is held down"""
 
-        self.delay = iteration_delay(self.level)
-        self.time_start = time.time()
+DEFAULT_DAS = 0.167
+"""Default delayed auto shift, the number of seconds a button has to be held before it starts repeating"""
 
-        self.playing = True
-
-    def lose(self):
-        """Ends the game for this board"""
-        self.playing = False
+DEFAULT_ARR = 0.033
+"""Default auto repeat rate, the number of seconds between each repeat once a held button has started repeating"""
 
-    def __get_existing_board(self) -> np.ndarray:
-        """Returns an array containing pieces for all pieces except the current one, used to determine valid
-        rotations and movements."""
 
-        result = np.zeros(shape=(self.width, self.height), dtype=int)
+def glyph_table(scale: int, background: str) -> tuple:
+    """Returns the string each cell value is drawn with, index 0 is an empty cell and index n is BLOCK_TYPES[n - 1],
+    every string is already repeated scale times, the tables are shared by every board with the same scale"""
+    key = (scale, background)
+    if key not in _glyph_tables:
+        _glyph_tables[key] = tuple([background * scale] + [b.symbol * scale for b in BLOCK_TYPES])
+    return _glyph_tables[key]
 
-        x_t, y_t = self.offset
 
-        # All of these pieces should already be in legal positions
-        for p in self.pieces:
-            x, y = p.offset
-            x -= x_t
-            y -= y_t
+class Board(BoardEngine):
+    """Contains a numpy array that holds the blocks for the game, contains methods for descent, dropping, and moving.
 
-            for i in range(y, y + 4):
-                for j in range(x, x + 4):
-                    if p.locations[i - y, j - x] != 0:
-                        result[j, i] = p.num
+    Adds real-time gravity and the display functions on top of the BoardEngine simulation.
 
-        return result
+    recorder is called with each action as it happens, if it's set before the board's functions are handed out"""
 
-    def update_grid(self) -> bool:
-        """Takes the locations of all of the pieces and places them into the board's grid,
-        reutrns whether the player is in a legal position or not"""
+    def __init__(self, pos_x: int, pos_y: int, piece_callback, width: int = 10, height: int = 20, scale: int = 1):
+        super().__init__(piece_callback, width, height, pos_x, pos_y)
+        self.scale = scale
+        self.width_total = width * scale
+        self.height_total = height * scale
+        self.background_char = '\u2591'
+        self.row_cache = [(None, '')] * height
+        self.row_glyphs = None
+        self.recorder = None
 
-        x_t, y_t = self.offset
+        self.time_start = time.monotonic()
 
-        self.grid = self.__get_existing_board()
+    def reset(self):
+        super().reset()
+        self.time_start = time.monotonic()
 
-        if self.current_piece is not None:
-            x, y = self.current_piece.offset
-            x -= x_t
-            y -= y_t
+    @property
+    def ready_update(self):
+        return time.monotonic() - self.time_start >= self.delay
 
-            for i in range(y, y + 4):
-                for j in range(x, x + 4):
-                    if self.current_piece.locations[i - y, j - x] != 0:
-                        if self.grid[j, i] == 0:
-                            self.grid[j, i] = self.current_piece.num
-                        else:
-                            return False
+    def get_function(self, function: KeyMappings):
+        """Returns the board method for the given KeyMapping command, which records the command first
+        if the board has a recorder"""
+        method = super().get_function(function)
+        recorder = self.recorder
+        if recorder is None or method is None:
+            return method
 
-        return True
+        action = function.value
 
-    @property
-    def ready_update(self):
-        return time.time() - self.time_start >= self.delay
+        def recorded():
+            recorder(action)
+            return method()
+        return recorded
 
     def update(self):
         if self.playing and self.ready_update:
-            if self.read_for_piece:
-                self.piece_callback()
-            else:
-                if not self.descend():
-                    self.place_piece()
+            was_waiting = self.read_for_piece
+            if self.recorder is not None:
+                self.recorder(GRAVITY)
+            self.step()
+            if not was_waiting:
+                self.time_start = time.monotonic()
+
+    def lose(self):
+        if self.recorder is not None and self.playing:
+            self.recorder(LOSE)
+        super().lose()
 
-                self.time_start = time.time()
-                if not self.update_grid():
-                    self.lose()
-                # TODO Handle updating level and score and shit
+    def resume(self, paused: float):
+        """Moves the gravity timer forward by the number of seconds the game was paused for"""
+        self.time_start += paused
 
     def new_piece(self, identifier: int):
         """Puts a new piece onto the board."""
-        self.current_piece = int_to_block(identifier, self.offset[0] + 4, self.offset[1] + 1)
-        self.read_for_piece = False
+        super().new_piece(identifier)
 
         # Resets the time interval
-        self.time_start = time.time()
-
-    def place_piece(self):
-        """Freezes the current piece where it's at and adds it to the pieces list, then generatesa a new piece"""
+        self.time_start = time.monotonic()
 
-        # Freezes the current piece
-        self.pieces.append(self.current_piece)
-        self.read_for_piece = True
+    def place_piece(self, dropped_grids: int = 0, hard: bool = False):
+        """Freezes the current piece where it's at and adds it to the settled cells, clears any lines that it completed,
+        updates the score and level, then generatesa a new piece
 
-        # Generates a new piece
-        self.piece_callback()
+        dropped_grids is the number of rows the piece was dropped to get here, hard should be True for a hard drop"""
+        super().place_piece(dropped_grids, hard)
 
         # Resets the time interval
-        self.time_start = time.time()
+        self.time_start = time.monotonic()
 
     # region Display Functions
 
     def get_board_string(self) -> str:
-        """Creates a string representation of the current board start"""
-        width, height = self.grid.shape
-        body = ""
+        """Creates a string representation of the current board start
 
+        Each row is only drawn again if its cells have changed since the last time, otherwise the boxed line from
+        last time is reused, the frame is then put together with a single join"""
+        grid = self.grid
+        width, height = grid.shape
+        glyphs = glyph_table(self.scale, self.background_char)
+        cells = np.ascontiguousarray(grid.T).tobytes()
+
+        if glyphs is not self.row_glyphs:
+            self.row_cache = [(None, '')] * height
+            self.row_glyphs = glyphs
+
+        lines = []
         for i in range(height):
-            for _ in range(self.scale):
-                for j in range(width):
-                    n = self.grid[j, i]
-                    if n > 0:
-                        n_b = int_to_block(n, 0, 0)
-                        char = n_b.symbol
-                    else:
-                        char = self.background_char
-                    body += char * self.scale
-                body += '\n'
-
-        return boxed_text(body[:-1]) + '\n'
+            row = cells[i * width:(i + 1) * width]
+            cached, line = self.row_cache[i]
+            if row != cached:
+                line = '\u2551' + ''.join([glyphs[n] for n in row]) + '\u2551'
+                self.row_cache[i] = (row, line)
+            lines.extend([line] * self.scale)
+
+        border = '\u2550' * (width * self.scale)
+        return '\n'.join(['\u2554' + border + '\u2557'] + lines + ['\u255A' + border + '\u255D', '', ''])
 
     def get_game_over_string(self) -> str:
         """Creates a string that notifies the user of the end of their game."""
@@ -212,330 +188,290 @@ class Board:
 
     # endregion
 
-    # region Piece class wrapper
-
-    def __inside_board(self, x: int = 0, y: int = 0) -> bool:
-        """Determines if the given coordinate exists inside of the board's space, or if it's outside of the region"""
-        return 0 <= x < self.width and 0 <= y < self.height
 
-    # region Shifting
+class Player:
+    """Represents a player, contains a queue for collected user input and
+    a list of valid keys that the player can accept
 
-    @property
-    def can_shift_right(self) -> bool:
-        if self.current_piece is not None:
-            x, y = self.current_piece.offset
-            xt, yt = self.offset
-            x -= xt
-            y -= yt
-
-            temp_grid = self.__get_existing_board()
-
-            for i in range(4):
-                for j in range(4):
-                    if self.current_piece.locations[i, j] != 0:
-                        temp = x + j + 1
-                        if not self.__inside_board(temp) or temp_grid[temp, y + i] != 0:
-                            return False
-            return True
-        return False
+    handlers maps each event that the player's keys use to the functions it triggers, it's rebuilt
+    whenever a new mapping is assigned to keys, and on_change is called whenever the keys or the joystick change.
 
-    def right(self) -> bool:
-        """Shifts the current piece right, returns True, if the piece was moved,
-        does not move the piece if it is against the wall"""
-        if self.can_shift_right:
-            self.current_piece.right()
-            self.update_grid()
-            return True
-        return False
+    The commands in REPEATING_MAPPINGS that are mapped to a press repeat while they're held, das seconds after the
+    press and then every arr seconds until the release, the repeats are made by update rather than sent as events,
+    and are timed from the press so that they don't drift with how often update is called.
 
-    @property
-    def can_shift_left(self) -> bool:
-        if self.current_piece is not None:
-            x, y = self.current_piece.offset
-            xt, yt = self.offset
-            x -= xt
-            y -= yt
-
-            temp_grid = self.__get_existing_board()
-
-            for i in range(4):
-                for j in range(4):
-                    if self.current_piece.locations[i, j] != 0:
-                        temp = x + j - 1
-                        if not self.__inside_board(temp) or temp_grid[temp, y + i] != 0:
-                            return False
-            return True
-        return False
+    Repeats that were overdue when a piece locks are dropped rather than spent on the next piece, and a held soft drop
+    is let go when its piece locks, so the next piece isn't dropped until down is pressed again"""
 
-    def left(self) -> bool:
-        """Shifts the current piece left, returns True if the piece was moved,
-        does not move the piece if it is against the wall"""
-        if self.can_shift_left:
-            self.current_piece.left()
-            self.update_grid()
-            return True
-        return False
+    def __init__(self, joystick: int, key_mapping: dict, board: BoardEngine, das: float = DEFAULT_DAS,
+                 arr: float = DEFAULT_ARR):
+        assert arr > 0, "The auto repeat rate must be positive"
 
-    # endregion
-
-    # region Rotation
+        self.on_change = None
+        self.board = board
+        self.das = das
+        self.arr = arr
+        self.held = {}
+        self.__joystick = joystick
+        self.keys = key_mapping
 
     @property
-    def can_rotate(self) -> bool:
-        # TODO Could probably be a bit more efficient
-
-        if self.current_piece is not None:
-            x, y = self.current_piece.offset
-            xt, yt = self.offset
-            x -= xt
-            y -= yt
-
-            # Tries rotating the piece first
-            self.current_piece.rotate()
-
-            # Checks if the piece overlaps with any of the existing pieces
-            # Checks if the piece is still on the board
-            temp_grid = self.__get_existing_board()
-            result = True
-            for i in range(4):
-                for j in range(4):
-                    if self.current_piece.locations[i, j] != 0:
-                        temp_x = x + j
-                        temp_y = y + i
-                        if not self.__inside_board(temp_x, temp_y) or temp_grid[temp_x, temp_y] != 0:
-                            result = False
-
-            # Undoes the rotation
-            self.current_piece.rotate(True)
-
-            return result
-        return False
-
-    def rotate(self) -> bool:
-        """Rotates the current piece, returns True if the piece was rotated,
-        does not rotate is doing so would invalidate the piece"""
-        if self.current_piece is not None:
-            self.current_piece.rotate()
-            self.update_grid()
-            return True
-        return False
+    def joystick(self) -> int:
+        return self.__joystick
 
-    # endregion
-
-    # region Descent
+    @joystick.setter
+    def joystick(self, value: int):
+        self.__joystick = value
+        if self.on_change is not None:
+            self.on_change()
 
     @property
-    def can_descend(self) -> bool:
-        if self.current_piece is not None:
-            x, y = self.current_piece.offset
-            xt, yt = self.offset
-            x -= xt
-            y -= yt
-
-            temp_grid = self.__get_existing_board()
-
-            for i in range(4):
-                for j in range(4):
-                    if self.current_piece.locations[i, j] != 0:
-                        temp = y + i + 1
-                        if not self.__inside_board(0, temp) or temp_grid[x + j, temp] != 0:
-                            return False
-            return True
-        return False
-
-    def descend(self) -> bool:
-        """Moves the current piece down one row, if possible"""
-        if self.can_descend:
-            self.current_piece.descend()
-            self.update_grid()
-            return True
-        return False
-
-    # region Drops
-
-    def __min_drop_distance(self) -> int:
-        """Finds the minimum amount of distance the current piece would need to descend to be considered placed.
-        :returns -1 if self.current_piece is None, or if the piece is alredy placed,
-         otherwise, the minimum distance to consider the piece placed."""
-
-        if self.current_piece is not None:
-            x_t, y_t = self.current_piece.offset
-
-            distances = []
-
-            temp_grid = self.__get_existing_board()
-
-            exposed = []
+    def keys(self) -> dict:
+        return self.__keys
+
+    @keys.setter
+    def keys(self, value: dict):
+        self.__keys = value
+        self.held = {}
+        self.released_on_lock = set()
+
+        handlers = {}
+        for mapping, event in value.items():
+            function = self.board.get_function(mapping)
+            if mapping == KeyMappings.SOFT_DROP:
+                self.released_on_lock.add(function)
+            if mapping in REPEATING_MAPPINGS and event.status:
+                handlers[event] = handlers.get(event, ()) + (partial(self.press, function),)
+                handlers[event.released] = handlers.get(event.released, ()) + (partial(self.release, function),)
+            else:
+                handlers[event] = handlers.get(event, ()) + (function,)
+        self.handlers = handlers
 
-            # Determines the locations on the piece that are exposed on the bottom
-            for i in range(4):
-                for j in range(4):
-                    if self.current_piece.locations[i, j] != 0:
-                        if i < 3 and self.current_piece.locations[i + 1, j] == 0:
-                            exposed.append((i, j))
-                        elif i == 3:
-                            exposed.append((i, j))
+        if self.on_change is not None:
+            self.on_change()
 
-            # Calculates the distances that the piece would have to travel at each of those locations to hit something
-            for y, x in exposed:
-                act_x = x + x_t
-                act_y = y + y_t
+    def __contains__(self, item):
+        """Determines if an event is registered on this controller, or if a KeyMapping has a mapped function"""
+        if isinstance(item, GamePadEventData):
+            return item in self.handlers
+        elif isinstance(item, KeyMappings):
+            return item in self.keys
+        elif isinstance(item, int):
+            return item == self.joystick
+        return False
 
-                current = act_y
-                while current < self.height and temp_grid[act_x, current] == 0:
-                    current += 1
+    def get_function(self, function: KeyMappings):
+        """Returns the mapped function for the given KeyMapping command"""
+        return self.board.get_function(function)
 
-                # We can break early if we determine that the piece cannot be dropped at all
-                if current - act_y - 1 < 0:
-                    return -1
+    # region Auto repeat
 
-                distances.append(current - act_y - 1)
+    @property
+    def next_repeat(self) -> float:
+        """Returns the monotonic time that the next held command is due to repeat at, or None if nothing is held"""
+        return min(self.held.values()) if self.held else None
 
-            return min(distances)
-        return -1
+    def press(self, function):
+        """Calls the function, and starts repeating it once it's been held for longer than das"""
+        placed = self.board.pieces_placed
+        function()
+        if function not in self.released_on_lock or self.board.pieces_placed == placed:
+            self.held[function] = time.monotonic() + self.das
 
-    def drop(self):
-        """Drops the current piece down to the nearest location it can go"""
-        self.current_piece.descend(self.__min_drop_distance())
-        self.place_piece()
-        self.update_grid()
+    def release(self, function):
+        """Stops repeating the function"""
+        self.held.pop(function, None)
 
-    def soft_drop(self):
-        """Performs a soft drop of the current piece"""
-        if not self.descend():
-            self.place_piece()
-        self.update_grid()
+    def update(self):
+        """Repeats each held command as many times as it's come due since the last update, human players otherwise
+        wait for their controller"""
+        if not self.held:
+            return
+
+        board = self.board
+        now = time.monotonic()
+        placed = board.pieces_placed
+        for function, due in list(self.held.items()):
+            while due <= now and board.pieces_placed == placed:
+                if board.playing:
+                    function()
+                due += self.arr
+
+            if board.pieces_placed != placed:
+                # The repeats that were saved up for the piece that just locked don't carry over to the next one
+                if function in self.released_on_lock:
+                    del self.held[function]
+                    continue
+                due = max(due, now + self.arr)
+            self.held[function] = due
+
+    def resume(self, paused: float):
+        """Lets the player catch up after the game was paused for the given number of seconds,
+        whatever was released during the pause was never seen, so nothing is held anymore"""
+        self.held = {}
 
     # endregion
 
-    # endregion
 
-    # endregion
+class BotPlayer(Player):
+    """A player without a controller, whose moves are made by a HeuristicBot instead,
+    move_delay is the minimum number of seconds between moves so that the bot can be watched"""
 
+    def __init__(self, key_mapping: dict, board: BoardEngine, bot: HeuristicBot = None, move_delay: float = 0.1):
+        super().__init__(None, key_mapping, board)
+        self.bot = bot if bot is not None else HeuristicBot()
+        self.move_delay = move_delay
+        self.time_last_move = time.monotonic()
 
-class Player:
-    """Represents a player, contains a queue for collected user input and
-    a list of valid keys that the player can accept"""
+    def resume(self, paused: float):
+        super().resume(paused)
+        self.time_last_move += paused
 
-    def __init__(self, joystick: int, key_mapping: dict, board: Board):
-        self.joystick = joystick
-        self.keys = key_mapping
-        self.board = board
+    def update(self):
+        """Makes the bot's next move, if it's been long enough since the last one"""
+        board = self.board
+        if not board.playing or board.read_for_piece or time.monotonic() - self.time_last_move < self.move_delay:
+            return
 
-    def __contains__(self, item):
-        """Determines if an event is registered on this controller, or if a KeyMapping has a mapped function"""
-        if isinstance(item, GamePadEventData):
-            for v in self.keys.values():
-                if item == v:
-                    return True
-            return False
-        elif isinstance(item, KeyMappings):
-            for k in self.keys:
-                if k == item:
-                    return True
-            return False
-        elif isinstance(item, int):
-            return item == self.joystick
-        return False
+        move = self.bot(board)
+        if move is not None:
+            self.get_function(move)()
+            if not board.update_grid():
+                board.lose()
+        self.time_last_move = time.monotonic()
 
-    def get_function(self, function: KeyMappings):
-        """Returns the mapped function for the given KeyMapping command"""
-        if function == KeyMappings.DROP:
-            return self.board.drop
-        elif function == KeyMappings.SOFT_DROP:
-            return self.board.soft_drop
-        elif function == KeyMappings.ROTATE:
-            return self.board.rotate
-        elif function == KeyMappings.SHIFT_LEFT:
-            return self.board.left
-        elif function == KeyMappings.SHIFT_RIGHT:
-            return self.board.right
-
-
-class Tetris:
+
+class Tetris(TetrisEngine):
     """Contains the functions to run a game of tetris, these include holding the grid values, terminal location, and
-    scores and such..."""
+    scores and such...
+
+    With record set, every game is recorded into recorder.replay, so that it can be played again with play_replay,
+    a random seed is picked if one isn't given, since the replay needs to know it"""
 
     def __init__(self, pos_x: int, pos_y: int, num_players: int = 1,
-                 board_width: int = 10, board_height: int = 20, scale: int = 1):
+                 board_width: int = 10, board_height: int = 20, scale: int = 1, seed: int = None, bag: bool = False,
+                 bots: bool = False, record: bool = False):
         self.offset = (pos_x, pos_y)
 
         self.scale = scale
-        self.board_width = board_width
-        self.board_width_adj = board_width * scale + 2
-        self.board_width_total = num_players * self.board_width_adj
-        self.board_height = board_height
-        self.board_height_total = board_height * scale + 2
+        self.num_players = num_players
+        self.control_box_width = 0
+        self.control_box_height = 0
+        self.__layout = None
 
-        self.highscore = 0
-        self.next_piece = -1
+        self.recorder = None
+        if record:
+            if seed is None:
+                seed = random.randrange(1 << 32)
+            self.recorder = ReplayRecorder(seed, num_players, board_width, board_height, bag)
 
-        self.boards = []
-        for i in range(num_players):
-            x = pos_x + self.board_width_adj * i
-            self.boards.append(Board(x, pos_y, self.gen_next_piece,
-                                     board_width, board_height, scale))
+        super().__init__(num_players, board_width, board_height, seed, bag)
 
         player_keymappings = {KeyMappings.SHIFT_LEFT: GamePadHatEventData(0, HatPositionType.LEFT, True),
-                              KeyMappings.SOFT_DROP: GamePadHatEventData(0, HatPositionType.DOWN, False),
+                              KeyMappings.SOFT_DROP: GamePadHatEventData(0, HatPositionType.DOWN, True),
                               KeyMappings.SHIFT_RIGHT: GamePadHatEventData(0, HatPositionType.RIGHT, True),
                               KeyMappings.ROTATE: GamePadButtonEventData(0, False),
                               KeyMappings.DROP: GamePadButtonEventData(3, False)}
 
-        if num_players > pgj.get_count():
-            raise AssertionError("You can't have more players than you have controllers, silly!")
+        # Players without a controller of their own can still be driven by something else, like a bot
+        controllers = joystick_count()
+        self.players = []
+        for x in range(num_players):
+            if x < controllers:
+                self.players.append(Player(x, deepcopy(player_keymappings), self.boards[x]))
+            elif bots:
+                self.players.append(BotPlayer(deepcopy(player_keymappings), self.boards[x]))
+            else:
+                self.players.append(Player(None, deepcopy(player_keymappings), self.boards[x]))
 
-        self.players = [Player(x, deepcopy(player_keymappings), self.boards[x]) for x in range(num_players)]
+        self.dispatch_table = {}
+        for p in self.players:
+            p.on_change = self.compile_dispatch
+        self.compile_dispatch()
 
         self.control_string = ""
-        self.control_box_width = 0
-        self.control_box_height = 0
         self.get_controls_box()
 
+    def create_board(self, index: int) -> Board:
+        """Creates the board for the player at the given index"""
+        x, y = self.offset
+        board = Board(x + self.board_width_adj * index, y, partial(self.gen_next_piece, index),
+                      self.board_width, self.board_height, self.scale)
+        if self.recorder is not None:
+            board.recorder = partial(self.recorder.record, index)
+        return board
+
+    def newgame(self):
+        if self.recorder is not None:
+            self.recorder.reset()
+        super().newgame()
+
+    def compile_dispatch(self):
+        """Rebuilds the table that maps a (joypad, event data) pair straight to the board functions that it triggers,
+        the players call this themselves whenever their keys or joystick change"""
+        table = {}
+        for p in self.players:
+            if p.joystick is not None:
+                for event, functions in p.handlers.items():
+                    table[(p.joystick, event)] = table.get((p.joystick, event), ()) + functions
+        self.dispatch_table = table
+
+    def dispatch(self, event) -> bool:
+        """Calls the board function that a gamepad event is mapped to, for each player that the event belongs to,
+        returns whether the event was mapped to anything"""
+        functions = self.dispatch_table.get((event.joypad, event.data), ())
+        for function in functions:
+            function()
+        return bool(functions)
+
+    def resume(self, paused: float):
+        """Moves every player's and board's timers forward by the number of seconds the game was paused for,
+        so the time spent paused doesn't count towards any gravity or bot moves"""
+        for p in self.players:
+            p.resume(paused)
+        for b in self.boards:
+            b.resume(paused)
+
+    @property
+    def layout(self) -> DisplayLayout:
+        """Returns the sizes and positions of the display's panels, they're only worked out again when the position,
+        number of players, board size, scale, or controls box size have changed"""
+        x, y = self.offset
+        key = (x, y, self.num_players, self.board_width, self.board_height, self.scale,
+               self.control_box_width, self.control_box_height)
+        if self.__layout is None or self.__layout.key != key:
+            self.__layout = DisplayLayout(*key)
+        return self.__layout
+
+    @property
+    def board_width_adj(self) -> int:
+        """Determines how many horizontal grid spaces each board takes up, including its border"""
+        return self.layout.board_width_adj
+
+    @property
+    def board_width_total(self) -> int:
+        """Determines how many horizontal grid spaces all of the boards take up together"""
+        return self.layout.board_width_total
+
+    @property
+    def board_height_total(self) -> int:
+        """Determines how many vertical grid spaces each board takes up, including its border"""
+        return self.layout.board_height_total
+
     @property
     def score_display_width(self) -> int:
         """Determines how many horizontal grid spaces the score box takes up"""
-        return max([len(x) for x in self.__str__().splitlines(False)])
+        return self.layout.score_width
 
     @property
     def score_display_height(self) -> int:
         """Determines how many vertical grid spaces the score box takes up"""
-        return len(self.__str__().splitlines())
+        return self.layout.score_height
 
     @property
     def display_midpoint(self) -> tuple:
         """Determines the center point of the display string and returns it as an (x, y) pair"""
-        x = sum((self.control_box_width, self.board_width_total, self.score_display_width)) // 2
-        y = max((self.control_box_height, self.board_height_total, self.score_display_height)) // 2
-        return x, y
-
-    def reset(self):
-        self.highscore = 0
-        self.newgame()
-
-    def newgame(self):
-        self.next_piece = -1
-        for b in self.boards:
-            b.reset()
-        self.gen_next_piece()
-
-    def gen_next_piece(self):
-        """Finds the next piece for play, if the game hasn't started yet, puts one in play.
-        Then prepares the next piece"""
-        tripped = False
-        if self.next_piece >= 0:
-            for b in self.boards:
-                if b.read_for_piece:
-                    b.new_piece(self.next_piece)
-                    tripped = True
-        else:
-            tripped = True
-            self.next_piece = random.choice(range(7))
-            for b in self.boards:
-                b.new_piece(self.next_piece)
-
-        if tripped:
-            self.next_piece = random.choice(range(7))
+        return self.layout.midpoint
 
     # region Display Functions
 
@@ -543,8 +479,6 @@ class Tetris:
         """Gets a box of text that contains the list of controls for the each player in the game.
 
         Also updates the control_box_width and control_box_height properties and the control_string property"""
-        x, y = self.offset
-
         result = "Controls:\n\n"
 
         for i, p in enumerate(self.players):
@@ -561,30 +495,30 @@ class Tetris:
         self.control_box_width = max([len(s) for s in split_control_string])
         self.control_box_height = len(split_control_string)
 
-        x_off = x + self.control_box_width
-
+        layout = self.layout
         for i, b in enumerate(self.boards):
-            b.offset = (x_off + self.board_width_adj * i, y)
+            b.offset = layout.board_offset(i)
 
     def get_score_box(self) -> str:
         """Gets the display box that contains the score data for each player"""
-        data = "Highscore: {}\n".format(self.highscore)
+        # The first line is padded out to the layout's width so that the box doesn't grow as the scores do
+        highscore = "Highscore: {}".format(self.highscore)
+        data = [aligned_text(highscore, max(len(highscore), self.layout.score_content_width))]
 
         for p, b in enumerate(self.boards):
-            data += "Player {}:\n".format(p)
-            data += "    Lines: {}\n".format(b.lines)
-            data += "    Score: {}\n".format(b.score)
-            data += "    Level: {}\n".format(b.level)
+            data.append("Player {}:".format(p))
+            data.append("    Lines: {}".format(b.lines))
+            data.append("    Score: {}".format(b.score))
+            data.append("    Level: {}".format(b.level))
 
-        data += "Next Piece:\n"
+        data.append("Next Piece:")
 
         next_piece = boxed_text("    \n    \n    \n    "
                                 if self.next_piece < 0 else str(int_to_block(self.next_piece, 0, 0))).splitlines(False)
 
-        for next_piece_line in next_piece:
-            data += " " + next_piece_line + " \n"
+        data.extend(" " + next_piece_line + " " for next_piece_line in next_piece)
 
-        return boxed_text(data[:-1])
+        return boxed_text('\n'.join(data))
 
     def __str__(self):
 
@@ -604,7 +538,14 @@ class Tetris:
         for b in self.boards:
             b.add_to_screen(screen)
 
-        add_multiline_string(self.get_score_box(), screen,
-                             x + self.control_box_width + self.board_width_total, y, False)
+        add_multiline_string(self.get_score_box(), screen, *self.layout.score_offset, False)
+
+    def add_countdown_to_screen(self, screen, count: int):
+        """Prints the game out to the screen with count in the middle of each player's board,
+        so the players can see what the starting piece will be while they wait"""
+        self.add_to_screen(screen)
+        for b in self.boards:
+            x, y = b.offset
+            screen.addstr(y + self.board_height_total // 2, x + self.board_width_adj // 2, "{}".format(count))
 
     # endregion
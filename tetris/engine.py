@@ -0,0 +1,509 @@
+from functools import partial
+import numpy as np
+
+from .shared import int_to_block, iteration_delay, get_score_points, KeyMappings
+from .generator import PieceGenerator, BagGenerator, PieceSequence
+from .search import find_placements
+from .zobrist import zobrist_keys, KEY_PADDING
+
+
+WALL_PADDING = 4
+"""Number of wall bits kept on either side of each of the board's row bitmasks, this is wide enough that a piece
+hanging off of either edge of the board always collides with the wall instead of shifting out of the mask"""
+
+
+class BoardEngine:
+    """Contains the simulation state of a single tetris board, the settled cells, the current piece, the score,
+    and the methods for moving, dropping, and placing pieces.
+
+    This only depends on numpy, it has no notion of time or of a display, so it can be stepped as fast as needed."""
+
+    def __init__(self, piece_callback, width: int = 10, height: int = 20, pos_x: int = 0, pos_y: int = 0):
+        self.offset = (pos_x, pos_y)
+        self.width = width
+        self.height = height
+        self.current_piece = None
+        self.pieces_placed = 0
+        self.settled = np.zeros(shape=(width, height), dtype=np.int8)
+        self.wall_mask = ((1 << WALL_PADDING) - 1) | (((1 << WALL_PADDING) - 1) << (WALL_PADDING + width))
+        self.full_row_mask = (1 << (width + 2 * WALL_PADDING)) - 1
+        self.rows = [self.wall_mask] * height
+        self.heights = [0] * width
+        self.filled = [0] * width
+        self.drop_cache = (None, -1)
+        self.zobrist_keys = zobrist_keys(width, height)
+        self.settled_hash = 0
+        self.piece_hash = 0
+        self.read_for_piece = True
+        self.piece_callback = piece_callback
+        self.cursor = None
+
+        self.level = 1
+        self.lines = 0
+        self.score = 0
+
+        self.delay = iteration_delay(self.level)
+
+        self.playing = True
+
+    def reset(self):
+        self.current_piece = None
+        self.pieces_placed = 0
+        self.settled = np.zeros(shape=(self.width, self.height), dtype=np.int8)
+        self.rows = [self.wall_mask] * self.height
+        self.heights = [0] * self.width
+        self.filled = [0] * self.width
+        self.drop_cache = (None, -1)
+        self.settled_hash = 0
+        self.piece_hash = 0
+
+        self.read_for_piece = True
+
+        self.level = 1
+        self.lines = 0
+        self.score = 0
+
+        self.delay = iteration_delay(self.level)
+
+        self.playing = True
+
+    def lose(self):
+        """Ends the game for this board"""
+        self.playing = False
+        if self.cursor is not None:
+            self.cursor.release()
+
+    def next_pieces(self, count: int = 1) -> tuple:
+        """Returns the nums of the next count pieces this board will get, if it draws from a PieceSequence"""
+        if self.cursor is not None:
+            return self.cursor.peek(count)
+        return ()
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Returns an array containing the settled pieces with the current piece overlaid on top of them,
+        cells contain the piece's num + 1, or 0 if they're empty.
+
+        This is only built when the board is being displayed, the movement checks use the row bitmasks instead."""
+        result = self.settled.copy()
+
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            rows, cols = self.current_piece.cell_arrays
+            rows = rows + y
+            cols = cols + x
+            inside = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+            result[cols[inside], rows[inside]] = self.current_piece.num + 1
+
+        return result
+
+    @property
+    def zobrist(self) -> int:
+        """Returns the Zobrist hash of the settled cells and the current piece's num, rotation, and position,
+        both halves are kept up to date as pieces move and lock, so this doesn't look at the grid"""
+        return self.settled_hash ^ self.piece_hash
+
+    def update_grid(self) -> bool:
+        """Returns whether the current piece is in a legal position or not"""
+        if self.current_piece is not None:
+            return not self.collides(self.current_piece.row_masks, *self.piece_position())
+        return True
+
+    def step(self):
+        """Advances the board by one gravity interval, requests a piece if the board is waiting for one,
+        otherwise moves the current piece down a row, placing it if it can't go any further"""
+        if self.playing:
+            if self.read_for_piece:
+                self.piece_callback()
+            else:
+                if not self.descend():
+                    self.place_piece()
+
+                if not self.update_grid():
+                    self.lose()
+
+    def placements(self) -> list:
+        """Returns every legal final resting position that the current piece can reach, as a list of Placements,
+        along with the moves needed to get there"""
+        return find_placements(self)
+
+    def get_function(self, function: KeyMappings):
+        """Returns the board method for the given KeyMapping command"""
+        if function == KeyMappings.DROP:
+            return self.drop
+        elif function == KeyMappings.SOFT_DROP:
+            return self.soft_drop
+        elif function == KeyMappings.ROTATE:
+            return self.rotate
+        elif function == KeyMappings.SHIFT_LEFT:
+            return self.left
+        elif function == KeyMappings.SHIFT_RIGHT:
+            return self.right
+
+    def new_piece(self, identifier: int):
+        """Puts a new piece onto the board, the board loses if the piece doesn't fit where it comes into play"""
+        self.current_piece = int_to_block(identifier, self.offset[0] + 4, self.offset[1] + 1)
+        self.piece_hash = self.zobrist_keys.piece(identifier, self.current_piece.rotation, *self.piece_position())
+        self.read_for_piece = False
+
+        # Otherwise the piece could still descend out of the settled cells it overlaps, since that only checks the
+        # row below it
+        if not self.update_grid():
+            self.lose()
+
+    def place_piece(self, dropped_grids: int = 0, hard: bool = False):
+        """Freezes the current piece where it's at and adds it to the settled cells, clears any lines that it completed,
+        updates the score and level, then generatesa a new piece
+
+        dropped_grids is the number of rows the piece was dropped to get here, hard should be True for a hard drop"""
+
+        x, y = self.piece_position()
+
+        # A piece that came into play on top of settled cells has nowhere to lock, locking it anyway would count
+        # the cells underneath it twice
+        if self.collides(self.current_piece.row_masks, x, y):
+            self.lose()
+            return
+
+        # Freezes the current piece
+        self.__settle_masks(self.current_piece.row_masks, x, y)
+
+        rows, cols = self.current_piece.cell_arrays
+        self.settled[cols + x, rows + y] = self.current_piece.num + 1
+        self.pieces_placed += 1
+        self.read_for_piece = True
+
+        keys = self.zobrist_keys.cells
+        for i, j in self.current_piece.cells:
+            column = x + j
+            self.filled[column] += 1
+            self.heights[column] = max(self.heights[column], self.height - (y + i))
+            self.settled_hash ^= keys[y + i][column]
+        self.piece_hash = 0
+
+        # Scores the placement
+        cleared = self.__clear_lines(y)
+        self.score += get_score_points(self.level, cleared, dropped_grids, hard)
+        if cleared:
+            self.lines += cleared
+            self.level = self.lines // 10 + 1
+            self.delay = iteration_delay(self.level)
+
+        # Generates a new piece
+        self.piece_callback()
+
+    def __clear_lines(self, y: int) -> int:
+        """Removes any full rows from the 4 rows starting at y, the only ones the last piece could have completed,
+        and shifts everything above them down, returns the number of rows that were cleared"""
+        top = max(y, 0)
+        bottom = min(y + 4, self.height)
+
+        # A row is full when its bitmask has every column set as well as the walls
+        full = [r for r in range(top, bottom) if self.rows[r] == self.full_row_mask]
+        count = len(full)
+
+        if count:
+            # Everything below the lowest full row stays put, everything above it moves down by the number of
+            # full rows beneath it, which is the same as keeping the remaining rows in order and padding the top
+            lowest = full[-1] + 1
+            keep = np.ones(lowest, dtype=bool)
+            keep[full] = False
+            remaining = np.flatnonzero(keep)
+
+            self.settled[:, count:lowest] = self.settled[:, remaining]
+            self.settled[:, :count] = 0
+
+            # Every row above the lowest full one ends up somewhere else, so their cells get rehashed
+            self.__rehash_rows(lowest)
+            self.rows[count:lowest] = [self.rows[r] for r in remaining]
+            self.rows[:count] = [self.wall_mask] * count
+            self.__rehash_rows(lowest)
+
+            # Every cleared row took one cell out of each column, but where the tops of the columns ended up
+            # depends on what was above them, so those get recounted
+            self.filled = [f - count for f in self.filled]
+            occupied = self.settled != 0
+            self.heights = np.where(occupied.any(axis=1), self.height - occupied.argmax(axis=1), 0).tolist()
+
+        return count
+
+    def __rehash_rows(self, end: int):
+        """Toggles the cells of the rows above end in the settled hash, calling this once takes them out of the hash,
+        and calling it again after the rows have changed puts their new cells in"""
+        columns = (1 << self.width) - 1
+        for r in range(end):
+            bits = (self.rows[r] >> WALL_PADDING) & columns
+            if bits:
+                self.settled_hash ^= self.zobrist_keys.row(r, bits)
+
+    # region Surface metrics
+
+    @property
+    def column_holes(self) -> list:
+        """Returns the number of empty cells underneath the top of each column"""
+        return [h - f for h, f in zip(self.heights, self.filled)]
+
+    @property
+    def holes(self) -> int:
+        """Returns the total number of empty cells that are covered by a settled cell"""
+        return sum(self.heights) - sum(self.filled)
+
+    @property
+    def well_depths(self) -> list:
+        """Returns how far each column is below the lower of its two neighbours, the walls count as full height"""
+        padded = [self.height] + self.heights + [self.height]
+        return [max(0, min(padded[c], padded[c + 2]) - padded[c + 1]) for c in range(self.width)]
+
+    # endregion
+
+    # region Piece class wrapper
+
+    def __inside_board(self, x: int = 0, y: int = 0) -> bool:
+        """Determines if the given coordinate exists inside of the board's space, or if it's outside of the region"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def piece_position(self) -> tuple:
+        """Returns the position of the current piece relative to the top-left corner of the board"""
+        x, y = self.current_piece.offset
+        xt, yt = self.offset
+        return x - xt, y - yt
+
+    def collides(self, masks: tuple, x: int, y: int) -> bool:
+        """Determines if a piece with the given row bitmasks, placed at (x, y) relative to the board,
+        would overlap the walls, the floor, or any of the settled pieces"""
+        shift = x + WALL_PADDING
+        if shift < 0:
+            return True
+
+        for i, m in enumerate(masks):
+            if m:
+                row = y + i
+                if row >= self.height:
+                    return True
+                if (self.rows[row] if row >= 0 else self.wall_mask) & (m << shift):
+                    return True
+        return False
+
+    def __settle_masks(self, masks: tuple, x: int, y: int):
+        """Adds the given row bitmasks, placed at (x, y) relative to the board, to the settled rows"""
+        shift = x + WALL_PADDING
+        for i, m in enumerate(masks):
+            if m and 0 <= y + i < self.height:
+                self.rows[y + i] |= m << shift
+
+    # region Shifting
+
+    @property
+    def can_shift_right(self) -> bool:
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            return not self.collides(self.current_piece.row_masks, x + 1, y)
+        return False
+
+    def right(self) -> bool:
+        """Shifts the current piece right, returns True, if the piece was moved,
+        does not move the piece if it is against the wall"""
+        if self.can_shift_right:
+            x, _ = self.piece_position()
+            self.current_piece.right()
+            self.piece_hash ^= self.zobrist_keys.xs[x + KEY_PADDING] ^ self.zobrist_keys.xs[x + 1 + KEY_PADDING]
+            return True
+        return False
+
+    @property
+    def can_shift_left(self) -> bool:
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            return not self.collides(self.current_piece.row_masks, x - 1, y)
+        return False
+
+    def left(self) -> bool:
+        """Shifts the current piece left, returns True if the piece was moved,
+        does not move the piece if it is against the wall"""
+        if self.can_shift_left:
+            x, _ = self.piece_position()
+            self.current_piece.left()
+            self.piece_hash ^= self.zobrist_keys.xs[x + KEY_PADDING] ^ self.zobrist_keys.xs[x - 1 + KEY_PADDING]
+            return True
+        return False
+
+    # endregion
+
+    # region Rotation
+
+    @property
+    def can_rotate(self) -> bool:
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            return not self.collides(self.current_piece.rotated_row_masks(), x, y)
+        return False
+
+    def rotate(self) -> bool:
+        """Rotates the current piece, returns True if the piece was rotated,
+        does not rotate is doing so would invalidate the piece"""
+        if self.can_rotate:
+            rotation = self.current_piece.rotation
+            self.current_piece.rotate()
+            self.piece_hash ^= (self.zobrist_keys.rotations[rotation] ^
+                                self.zobrist_keys.rotations[self.current_piece.rotation])
+            return True
+        return False
+
+    # endregion
+
+    # region Descent
+
+    @property
+    def can_descend(self) -> bool:
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            return not self.collides(self.current_piece.row_masks, x, y + 1)
+        return False
+
+    def descend(self) -> bool:
+        """Moves the current piece down one row, if possible"""
+        if self.can_descend:
+            _, y = self.piece_position()
+            self.current_piece.descend()
+            self.piece_hash ^= self.zobrist_keys.ys[y + KEY_PADDING] ^ self.zobrist_keys.ys[y + 1 + KEY_PADDING]
+            return True
+        return False
+
+    # region Drops
+
+    def __min_drop_distance(self) -> int:
+        """Finds the minimum amount of distance the current piece would need to descend to be considered placed.
+        :returns -1 if self.current_piece is None, or if the piece is alredy placed,
+         otherwise, the minimum distance to consider the piece placed.
+
+        The result is cached until the piece moves or the settled cells change."""
+
+        if self.current_piece is not None:
+            x, y = self.piece_position()
+            key = (self.current_piece.num, self.current_piece.rotation, x, y, self.pieces_placed)
+
+            cached_key, distance = self.drop_cache
+            if cached_key != key:
+                distance = self.__find_drop_distance(x, y)
+                self.drop_cache = (key, distance)
+
+            return distance
+        return -1
+
+    def __find_drop_distance(self, x: int, y: int) -> int:
+        """Finds how far the current piece at (x, y) can fall, using the piece's skirt and the column heights when the
+        piece is above all of the columns it covers, otherwise it's tucked under something and has to be checked
+        row by row"""
+        masks = self.current_piece.row_masks
+        if self.collides(masks, x, y):
+            return -1
+
+        distance = self.height
+        for j, bottom in enumerate(self.current_piece.skirt):
+            if bottom >= 0:
+                top = self.height - self.heights[x + j]
+                if y + bottom >= top:
+                    break
+                distance = min(distance, top - (y + bottom) - 1)
+        else:
+            return distance
+
+        distance = 0
+        while not self.collides(masks, x, y + distance + 1):
+            distance += 1
+
+        return distance
+
+    @property
+    def ghost_position(self) -> tuple:
+        """Returns the (x, y) position, relative to the board, that the current piece would land at if it were dropped,
+        or None if there isn't a piece in play"""
+        distance = self.__min_drop_distance()
+        if distance < 0:
+            return None
+
+        x, y = self.piece_position()
+        return x, y + distance
+
+    def drop(self):
+        """Drops the current piece down to the nearest location it can go"""
+        distance = self.__min_drop_distance()
+        if distance > 0:
+            self.current_piece.descend(distance)
+        # The piece is locked straight away, so there's no need to rehash where it fell to
+        self.place_piece(max(distance, 0), True)
+
+    def soft_drop(self):
+        """Performs a soft drop of the current piece"""
+        if self.descend():
+            self.score += get_score_points(self.level, 0, 1)
+        else:
+            self.place_piece()
+
+    # endregion
+
+    # endregion
+
+    # endregion
+
+
+class TetrisEngine:
+    """Contains the simulation of a game of tetris, one or more boards that all draw from the same sequence of pieces,
+    each board has its own cursor into the sequence so that every player gets the same pieces in the same order.
+
+    Like BoardEngine, this only depends on numpy and doesn't need any controllers or a display."""
+
+    def __init__(self, num_players: int = 1, board_width: int = 10, board_height: int = 20, seed: int = None,
+                 bag: bool = False):
+        self.board_width = board_width
+        self.board_height = board_height
+
+        self.highscore = 0
+        self.sequence = PieceSequence(BagGenerator(seed) if bag else PieceGenerator(seed))
+
+        self.boards = [self.create_board(i) for i in range(num_players)]
+        for b in self.boards:
+            b.cursor = self.sequence.cursor()
+
+    def create_board(self, index: int) -> BoardEngine:
+        """Creates the board for the player at the given index"""
+        return BoardEngine(partial(self.gen_next_piece, index), self.board_width, self.board_height)
+
+    @property
+    def playing(self) -> bool:
+        """Returns True if any of the boards are still playing"""
+        return any(b.playing for b in self.boards)
+
+    @property
+    def next_piece(self) -> int:
+        """Returns the num of the next piece that the first board that's still playing will get,
+        or -1 if the game hasn't started yet or is over"""
+        for b in self.boards:
+            if b.playing and b.current_piece is not None:
+                return b.cursor.peek_at(0)
+        return -1
+
+    def reset(self):
+        self.highscore = 0
+        self.newgame()
+
+    def newgame(self):
+        for b in self.boards:
+            b.reset()
+            self.sequence.attach(b.cursor)
+        self.sequence.reset()
+        self.gen_next_piece()
+
+    def gen_next_piece(self, index: int = None):
+        """Puts the next piece from the sequence into play on the board at index, if it's waiting for one,
+        if index isn't given, every waiting board gets its next piece"""
+        self.highscore = max([self.highscore] + [b.score for b in self.boards])
+
+        for b in (self.boards if index is None else (self.boards[index],)):
+            if b.read_for_piece:
+                b.new_piece(b.cursor.next())
+
+    def step(self):
+        """Advances every board by one gravity interval"""
+        for b in self.boards:
+            b.step()
@@ -0,0 +1,219 @@
+import importlib
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .engine import TetrisEngine, BoardEngine
+from .bot import HeuristicBot
+from .shared import KeyMappings
+
+
+CHUNKS_PER_WORKER = 2
+"""Most chunks of games that are waiting on or being played by each worker at once, the rest of the specs aren't
+read until there's room for them, so farming any number of games only keeps a few chunks in memory"""
+
+
+# region Policies
+
+class RandomPolicy:
+    """Picks a random move every step"""
+
+    def __init__(self, spec, rng: random.Random):
+        self.rng = rng
+        self.moves = list(KeyMappings)
+
+    def __call__(self, board: BoardEngine) -> KeyMappings:
+        return self.rng.choice(self.moves)
+
+
+class ScriptedPolicy:
+    """Plays the moves in the spec's script in order, one per step, looping back to the start when it runs out"""
+
+    def __init__(self, spec, rng: random.Random):
+        self.moves = itertools.cycle([KeyMappings(m) for m in spec.script]) if spec.script else None
+
+    def __call__(self, board: BoardEngine) -> KeyMappings:
+        return next(self.moves) if self.moves is not None else None
+
+
+class HeuristicPolicy(HeuristicBot):
+    """Places every piece wherever the HeuristicBot thinks is best"""
+
+    def __init__(self, spec, rng: random.Random):
+        super().__init__()
+
+
+class LookaheadPolicy(HeuristicBot):
+    """Places every piece with a HeuristicBot that also considers where the next piece could go, farmed games don't
+    run against the clock, so the search isn't given a time budget and the same seed always plays out the same way"""
+
+    def __init__(self, spec, rng: random.Random):
+        super().__init__(lookahead=1, budget=None)
+
+
+POLICIES = {'random': RandomPolicy,
+            'scripted': ScriptedPolicy,
+            'heuristic': HeuristicPolicy,
+            'lookahead': LookaheadPolicy}
+"""Maps a policy name to a class that's created with (spec, rng) for each player,
+and then called with the player's board every step to get the KeyMappings move to make, or None to make no move"""
+
+
+def register_policy(name: str, policy):
+    """Makes a policy available to game specs by name, policies that live outside of this module need to be registered
+    in the workers too, by listing their module in the farm's warm_modules"""
+    POLICIES[name] = policy
+
+# endregion
+
+
+class GameSpec:
+    """Describes a single seeded game for the farm to play, every player uses the named policy"""
+
+    def __init__(self, seed: int, num_players: int = 1, policy: str = 'random', board_width: int = 10,
+                 board_height: int = 20, moves_per_step: int = 1, max_steps: int = 100000, script: tuple = (),
+                 bag: bool = False):
+        self.seed = seed
+        self.num_players = num_players
+        self.policy = policy
+        self.board_width = board_width
+        self.board_height = board_height
+        self.moves_per_step = moves_per_step
+        self.max_steps = max_steps
+        self.script = script
+        self.bag = bag
+
+
+class GameResult:
+    """Contains the outcome of a farmed game, lines, score, level and pieces_placed have an entry per player"""
+
+    def __init__(self, spec: GameSpec, engine: TetrisEngine, steps: int, duration: float):
+        self.spec = spec
+        self.seed = spec.seed
+        self.lines = [b.lines for b in engine.boards]
+        self.score = [b.score for b in engine.boards]
+        self.level = [b.level for b in engine.boards]
+        self.pieces_placed = [b.pieces_placed for b in engine.boards]
+        self.steps = steps
+        self.duration = duration
+
+    def __str__(self) -> str:
+        return "Game {}: lines {}, score {}, level {}, pieces {}, {} steps in {:.3f}s".format(
+            self.seed, self.lines, self.score, self.level, self.pieces_placed, self.steps, self.duration)
+
+
+def run_game(spec: GameSpec) -> GameResult:
+    """Plays a single game to the end, or until it reaches the spec's step limit, as fast as possible"""
+    start = time.perf_counter()
+
+    rng = random.Random(spec.seed)
+
+    engine = TetrisEngine(spec.num_players, spec.board_width, spec.board_height, spec.seed, spec.bag)
+    engine.newgame()
+    policies = [POLICIES[spec.policy](spec, rng) for _ in engine.boards]
+
+    steps = 0
+    while engine.playing and steps < spec.max_steps:
+        for _ in range(spec.moves_per_step):
+            for b, policy in zip(engine.boards, policies):
+                if b.playing and not b.read_for_piece:
+                    move = policy(b)
+                    if move is not None:
+                        b.get_function(move)()
+                        if not b.update_grid():
+                            b.lose()
+
+        engine.step()
+        steps += 1
+
+    return GameResult(spec, engine, steps, time.perf_counter() - start)
+
+
+def run_games(specs: list) -> list:
+    """Plays a chunk of games in order, this is what gets sent to the workers"""
+    return [run_game(spec) for spec in specs]
+
+
+def warm_worker(modules: tuple):
+    """Imports the given modules once when a worker starts so that none of the games pay for it"""
+    for module in modules:
+        importlib.import_module(module)
+
+
+class GameFarm:
+    """Plays large numbers of seeded games across a pool of worker processes.
+
+    The workers are started once and kept for the life of the farm, so the imports are only paid for once per worker,
+    results are streamed back as each chunk of games finishes."""
+
+    def __init__(self, workers: int = None, chunk_size: int = 16, warm_modules: tuple = ('tetris.farm',)):
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.chunk_size = chunk_size
+        self.warm_modules = warm_modules
+        self.executor = None
+
+        self.games_completed = 0
+        self.elapsed = 0
+
+    def start(self):
+        """Starts the worker processes, if they aren't already running"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=warm_worker,
+                                                initargs=(self.warm_modules,))
+
+    def shutdown(self):
+        """Stops the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def games_per_second(self) -> float:
+        """Returns the number of games completed per second of farming so far"""
+        return self.games_completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __submit(self, specs, pending: set):
+        """Submits chunks of games from the specs iterator until the workers have as many as they should have in flight,
+        or the specs run out"""
+        while len(pending) < self.workers * CHUNKS_PER_WORKER:
+            chunk = list(itertools.islice(specs, self.chunk_size))
+            if not chunk:
+                return
+            pending.add(self.executor.submit(run_games, chunk))
+
+    def run(self, specs):
+        """Plays every game in specs, yielding each GameResult as soon as the chunk containing it finishes,
+        results don't come back in the same order as specs.
+
+        specs can be any iterable, including a generator, it's only read a chunk at a time as the workers free up"""
+        self.start()
+        start = time.perf_counter()
+
+        specs = iter(specs)
+        pending = set()
+        self.__submit(specs, pending)
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                self.__submit(specs, pending)
+
+                for future in done:
+                    for result in future.result():
+                        self.games_completed += 1
+                        self.elapsed += time.perf_counter() - start
+                        start = time.perf_counter()
+                        yield result
+        finally:
+            for future in pending:
+                future.cancel()
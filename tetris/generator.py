@@ -0,0 +1,171 @@
+import random
+
+from .pieces import BLOCK_TYPES
+
+
+class PieceGenerator:
+    """Generates pieces uniformly at random, giving it a seed makes the sequence reproducible"""
+
+    def __init__(self, seed: int = None):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def reset(self):
+        """Restarts the sequence from the beginning, if the generator was seeded"""
+        self.random.seed(self.seed)
+
+    def next(self) -> int:
+        """Returns the num of the next piece in the sequence"""
+        return self.random.randrange(len(BLOCK_TYPES))
+
+    def fill(self, buffer: bytearray, start: int, count: int):
+        """Writes the next count pieces of the sequence into buffer, starting at index start"""
+        for i in range(start, start + count):
+            buffer[i] = self.next()
+
+
+class BagGenerator(PieceGenerator):
+    """Generates pieces in shuffled bags of one of each piece, so no piece is ever more than 12 pieces away"""
+
+    def __init__(self, seed: int = None):
+        super().__init__(seed)
+        self.bag = []
+
+    def reset(self):
+        super().reset()
+        self.bag = []
+
+    def next(self) -> int:
+        if not self.bag:
+            self.bag = list(range(len(BLOCK_TYPES)))
+            self.random.shuffle(self.bag)
+        return self.bag.pop()
+
+
+class PieceCursor:
+    """A reader's position in a PieceSequence, each board gets its own so they can all draw from the same sequence
+    at their own pace.
+
+    Once a cursor is released its pieces can be overwritten, so peeking through it gives -1 or nothing instead"""
+
+    __slots__ = ('sequence', 'position', 'attached')
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.position = 0
+        self.attached = False
+
+    def next(self) -> int:
+        """Returns the next piece and moves past it"""
+        piece = self.peek_at(0)
+        self.position += 1
+        return piece
+
+    def peek_at(self, offset: int = 0) -> int:
+        """Returns the piece that's offset pieces after the next one, without moving the cursor,
+        or -1 if the cursor has been released"""
+        if not self.attached:
+            return -1
+
+        index = self.position + offset
+        sequence = self.sequence
+        if index >= sequence.produced:
+            sequence.ensure(index + 1)
+        return sequence.buffer[index & sequence.mask]
+
+    def peek(self, count: int = 1) -> tuple:
+        """Returns the next count pieces, without moving the cursor, or nothing if the cursor has been released"""
+        if not self.attached:
+            return ()
+
+        sequence = self.sequence
+        if self.position + count > sequence.produced:
+            sequence.ensure(self.position + count)
+        return tuple(sequence.buffer[(self.position + i) & sequence.mask] for i in range(count))
+
+    def release(self):
+        """Stops the cursor from holding onto pieces it hasn't read yet, for boards that are done playing"""
+        self.sequence.release(self)
+
+
+class PieceSequence:
+    """A seeded sequence of pieces shared by any number of PieceCursors.
+
+    Pieces are generated ahead of time in chunks into a ring buffer, reading a piece is just an index into it, and
+    slots are reused once every cursor has moved past them. If a cursor falls a whole buffer behind the one in front,
+    the buffer is doubled rather than losing its pieces."""
+
+    def __init__(self, generator: PieceGenerator = None, capacity: int = 64):
+        self.generator = generator if generator is not None else PieceGenerator()
+
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.mask = self.capacity - 1
+
+        self.buffer = bytearray(self.capacity)
+        self.produced = 0
+        self.cursors = []
+
+    def reset(self):
+        """Restarts the sequence, and moves every cursor back to the beginning of it"""
+        self.generator.reset()
+        self.produced = 0
+        for c in self.cursors:
+            c.position = 0
+
+    def cursor(self) -> PieceCursor:
+        """Creates a new cursor at the start of the sequence"""
+        result = PieceCursor(self)
+        self.attach(result)
+        return result
+
+    def attach(self, cursor: PieceCursor):
+        """Starts keeping the pieces a cursor hasn't read yet again, after it was released"""
+        if cursor not in self.cursors:
+            self.cursors.append(cursor)
+        cursor.attached = True
+
+    def release(self, cursor: PieceCursor):
+        """Forgets about a cursor, so the pieces it hasn't read can be overwritten"""
+        if cursor in self.cursors:
+            self.cursors.remove(cursor)
+        cursor.attached = False
+
+    def ensure(self, end: int):
+        """Makes sure every piece before the absolute position end has been generated"""
+        if end <= self.produced:
+            return
+
+        oldest = min([c.position for c in self.cursors] + [self.produced])
+        if end - oldest > self.capacity:
+            self.__grow(end - oldest, oldest)
+
+        # Fills every free slot, not just the ones that were asked for, so this only happens once per buffer
+        self.__fill(oldest + self.capacity - self.produced)
+
+    def __fill(self, count: int):
+        """Generates the next count pieces into the buffer, wrapping around the end of it"""
+        start = self.produced & self.mask
+        first = min(count, self.capacity - start)
+
+        self.generator.fill(self.buffer, start, first)
+        if count > first:
+            self.generator.fill(self.buffer, 0, count - first)
+
+        self.produced += count
+
+    def __grow(self, needed: int, oldest: int):
+        """Increases the size of the buffer until it holds at least needed pieces,
+        keeping the pieces from oldest onwards that have already been generated"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+
+        buffer = bytearray(capacity)
+        for i in range(oldest, self.produced):
+            buffer[i & (capacity - 1)] = self.buffer[i & self.mask]
+
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.buffer = buffer
@@ -1,17 +1,77 @@
-import pygame
-from multiprocessing import Process, Queue
+from multiprocessing import Process
 from enum import Enum
 import time
 
-pygame.init()
-if not pygame.joystick.get_init():
-    pygame.joystick.init()
 
-pgj = pygame.joystick
+# region Lazy initialization
+
+def init_joysticks():
+    """Imports pygame and initializes its joystick module the first time it's called, returns the joystick module.
+
+    pygame takes a while to import, so nothing in here touches it until a joystick is actually needed."""
+    import pygame
+
+    if not pygame.joystick.get_init():
+        pygame.joystick.init()
+
+    return pygame.joystick
+
+
+def init_pygame():
+    """Imports pygame and initializes all of it, including the event queue and joysticks, the first time it's called,
+    returns the pygame module"""
+    import pygame
+
+    if not pygame.get_init():
+        pygame.init()
+    init_joysticks()
+
+    return pygame
+
+
+def joystick_count() -> int:
+    """Returns the number of joysticks that are plugged in"""
+    return init_joysticks().get_count()
+
+
+class LazyQueue:
+    """A class attribute that creates its multiprocessing Queue the first time it's accessed,
+    so that importing the class doesn't create any pipes or locks, with events set it's an EventQueue"""
+
+    def __init__(self, maxsize: int = 0, events: bool = False):
+        self.maxsize = maxsize
+        self.events = events
+        self.queue = None
+
+    def __get__(self, instance, owner):
+        if self.queue is None:
+            if self.events:
+                from .transport import EventQueue as Queue
+            else:
+                from multiprocessing import Queue
+            self.queue = Queue(self.maxsize)
+        return self.queue
+
+
+class LazyReceiver:
+    """A class attribute that wraps its owner's event queue in an EventReceiver the first time it's accessed,
+    the owner's queue has to be called q, and has to be an EventQueue for the receiver's fileno to work"""
+
+    def __init__(self):
+        self.receiver = None
+
+    def __get__(self, instance, owner):
+        if self.receiver is None:
+            from .transport import EventReceiver
+            self.receiver = EventReceiver(owner.q)
+        return self.receiver
+
+# endregion
 
 
 def get_available() -> list:
     """Finds all available joysticks and returns them as a list"""
+    pgj = init_joysticks()
     result = []
 
     for i in range(pgj.get_count()):
@@ -30,7 +90,7 @@ def get_wrappers() -> list:
     return result
 
 
-def display_gamepad_info(pad: pgj.Joystick) -> str:
+def display_gamepad_info(pad) -> str:
     return "Name: {}\nID: {}\nNumber of Axes: {}\nNumber of Balls: {}\n" \
            "Number of Buttons: {}\nNumber of Hats: {}".format(
             pad.get_name(),
@@ -74,25 +134,79 @@ def position_to_type(value: int, vert: bool = True) -> HatPositionType:
 # endregion
 
 
+DATA_BITS = 13
+"""Number of low bits of an event's code that hold its data's code, the joypad number is stored above them"""
+
+INDEX_COUNT = 1 << (DATA_BITS - 5)
+"""Number of button or hat numbers that fit in bits 5-12 of a data's code, any higher would spill into the joypad"""
+
+
 class GamePadEventData:
-    """Contains the data from a GamePadEvent"""
+    """Contains the data from a GamePadEvent.
+
+    Every combination of values only ever has a single instance, creating the same data again returns the existing one,
+    so instances are immutable, compare and hash by identity, and pickle as nothing but their code.
+
+    The code packs the status into bit 0, whether it's a hat into bit 1, the hat direction into bits 2-4,
+    and the button or hat number into bits 5-12."""
+
+    __slots__ = ('code',)
+
+    _interned = {}
+    """Maps the code of every instance that's been created to the instance"""
+
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __delattr__(self, item):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __hash__(self):
+        return self.code
+
+    def __reduce__(self):
+        return GamePadEventData.decode, (self.code,)
+
+    @property
+    def released(self) -> 'GamePadEventData':
+        """Returns the data for letting go of the same button or hat direction"""
+        return GamePadEventData.decode(self.code & ~1)
 
-    def __eq__(self, other):
-        return isinstance(other, self.__class__)
+    @classmethod
+    def _intern(cls, code: int, **values) -> 'GamePadEventData':
+        """Returns the instance with the given code, creating it with the given attribute values if it's new"""
+        result = GamePadEventData._interned.get(code)
+        if result is None:
+            result = object.__new__(cls)
+            object.__setattr__(result, 'code', code)
+            for k, v in values.items():
+                object.__setattr__(result, k, v)
+            GamePadEventData._interned[code] = result
+        return result
+
+    @staticmethod
+    def decode(code: int) -> 'GamePadEventData':
+        """Returns the data with the given code"""
+        result = GamePadEventData._interned.get(code)
+        if result is not None:
+            return result
+
+        status = bool(code & 1)
+        index = code >> 5
+        if code & 2:
+            return GamePadHatEventData(index, HatPositionType((code >> 2) & 7), status)
+        return GamePadButtonEventData(index, status)
 
 
 class GamePadButtonEventData(GamePadEventData):
     """Contains the data from a button press or release"""
 
-    def __init__(self, button_id: int, status: bool):
-        self.button = button_id
-        self.status = status
+    __slots__ = ('button', 'status')
 
-    def __eq__(self, other):
-        if super().__eq__(other):
-            return other.button == self.button and other.status == self.status
-        else:
-            return False
+    def __new__(cls, button_id: int, status: bool):
+        assert 0 <= button_id < INDEX_COUNT, "Button {} doesn't fit in an event's code".format(button_id)
+        status = bool(status)
+        return cls._intern(status | (button_id << 5), button=button_id, status=status)
 
     def __str__(self) -> str:
         return "Button {}: {}".format(self.button, self.status)
@@ -101,52 +215,98 @@ class GamePadButtonEventData(GamePadEventData):
 class GamePadHatEventData(GamePadEventData):
     """Contains the data from a hat press or release"""
 
-    def __init__(self, hat_id: int, hat_direction: HatPositionType, status: bool):
-        self.hat = hat_id
-        self.hat_button = hat_direction
-        self.status = status
+    __slots__ = ('hat', 'hat_button', 'status')
 
-    def __eq__(self, other):
-        if super().__eq__(other):
-            return other.hat == self.hat and other.status == self.status and other.hat_button == self.hat_button
+    def __new__(cls, hat_id: int, hat_direction: HatPositionType, status: bool):
+        assert 0 <= hat_id < INDEX_COUNT, "Hat {} doesn't fit in an event's code".format(hat_id)
+        status = bool(status)
+        return cls._intern(status | 2 | (hat_direction.value << 2) | (hat_id << 5),
+                           hat=hat_id, hat_button=hat_direction, status=status)
 
     def __str__(self) -> str:
         return "Hat {}: {} -> {}".format(self.hat, self.hat_button.name, self.status)
 
 
 class GamePadEvent:
-    """Contains an update about a joypad"""
-    def __init__(self, event_type: GamePadEventType, joypad_id: int, data: GamePadEventData):
-        self.event_type = event_type
-        self.joypad = joypad_id
-        self.data = data
+    """Contains an update about a joypad.
+
+    Like the data, every combination only has a single, immutable, instance, the code is the data's code with
+    the joypad number above it, so a whole event fits in an int."""
+
+    __slots__ = ('event_type', 'joypad', 'data', 'code')
+
+    _interned = {}
+    """Maps the code of every event that's been created to the event"""
+
+    def __new__(cls, event_type: GamePadEventType, joypad_id: int, data: GamePadEventData):
+        assert joypad_id >= 0, "Joypad {} can't be negative".format(joypad_id)
+        code = data.code | (joypad_id << DATA_BITS)
+        result = GamePadEvent._interned.get(code)
+        if result is None:
+            result = object.__new__(cls)
+            object.__setattr__(result, 'event_type', event_type)
+            object.__setattr__(result, 'joypad', joypad_id)
+            object.__setattr__(result, 'data', data)
+            object.__setattr__(result, 'code', code)
+            GamePadEvent._interned[code] = result
+        return result
+
+    def __setattr__(self, key, value):
+        raise AttributeError("GamePadEvent is immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError("GamePadEvent is immutable")
+
+    def __hash__(self):
+        return self.code
+
+    def __reduce__(self):
+        return GamePadEvent.decode, (self.code,)
 
     def __str__(self) -> str:
         return '{} from {} to state {}'.format(self.event_type.name, self.joypad, self.data)
 
-    def __eq__(self, other) -> bool:
-        if isinstance(other, self.__class__):
-            return other.event_type == self.event_type and other.joypad == self.joypad and other.data == self.data
+    @staticmethod
+    def decode(code: int) -> 'GamePadEvent':
+        """Returns the event with the given code"""
+        result = GamePadEvent._interned.get(code)
+        if result is not None:
+            return result
+
+        data = GamePadEventData.decode(code & ((1 << DATA_BITS) - 1))
+        event_type = GamePadEventType.DIRECTIONAL_PAD if isinstance(data, GamePadHatEventData) \
+            else GamePadEventType.BUTTON
+        return GamePadEvent(event_type, code >> DATA_BITS, data)
 
 # endregion
 
 
 class PygameEventReader(Process):
     """Continuously polls the pygame event queue and pulls any gamepad data out of it.
-    This should stop the event queue from freezing or causing problems"""
+    This should stop the event queue from freezing or causing problems
+
+    In event driven mode it blocks until SDL has an event for it, for at most wait_timeout seconds at a time so that it
+    still notices when it's asked to stop, and SDL only queues the joystick and quit events that it actually handles,
+    otherwise it polls every polling_interval seconds"""
 
-    stop_q = Queue(1)
-    q = Queue()
+    stop_q = LazyQueue(1)
+    q = LazyQueue(events=True)
+    events = LazyReceiver()
     running = False
 
-    def __init__(self, polling_interval: float = 0.05, hold_down_repeat: bool = True):
+    def __init__(self, polling_interval: float = 0.05, event_driven: bool = False, wait_timeout: float = 0.1):
         super().__init__()
         self.interval = polling_interval
-        self.repeat = hold_down_repeat
+        self.event_driven = event_driven
+        self.wait_timeout = wait_timeout
         self.previous_buttons = {}
         self.previous_hats = {}
         self.previous_values = {}
-        for joy in range(pgj.get_count()):
+
+        # Creates the queues before the process is started so that both sides share the same ones
+        self.queues = (self.stop_q, self.q)
+
+        for joy in range(joystick_count()):
             self.previous_values[joy] = (HatPositionType.NOT_PRESSED, HatPositionType.NOT_PRESSED)
 
     def join(self, **kwargs):
@@ -157,30 +317,58 @@ class PygameEventReader(Process):
         if not self.running:
             self.running = True
 
+        from .transport import EventBatcher
+
+        pygame = init_pygame()
+
+        # Every event from a poll cycle goes across in one message
+        batch = EventBatcher(self.q)
+
+        if self.event_driven:
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([pygame.QUIT, pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION])
+
+            # The filter only applies to new events, so whatever init already queued up is thrown away
+            pygame.event.clear()
+
+        handled = (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION)
+
         while self.stop_q.empty():
             start = time.time()
-            changed_buttons = []
-            changed_hats = []
 
-            for event in pygame.event.get():
+            if self.event_driven:
+                # Sleeps until SDL has something, then takes everything else that's arrived along with it
+                first = pygame.event.wait(int(self.wait_timeout * 1000))
+                events = [first] + pygame.event.get() if first.type != pygame.NOEVENT else []
+            else:
+                events = pygame.event.get()
+
+            # pygame doesn't expose SDL's own timestamps, so everything pulled off together shares one capture time
+            captured = time.monotonic()
+
+            for event in events:
+
+                if event.type == pygame.QUIT:
+                    self.stop_q.put(True)
+                    continue
+
+                # Device and audio events don't have a joystick to look up
+                if event.type not in handled:
+                    continue
 
                 if event.joy not in self.previous_buttons:
                     self.previous_buttons[event.joy] = {}
                 if event.joy not in self.previous_hats:
                     self.previous_hats[event.joy] = {}
 
-                if event.type == pygame.QUIT:
-                    self.stop_q.put(True)
-
-                elif event.type == pygame.JOYBUTTONDOWN:
-                    self.q.put(GamePadEvent(GamePadEventType.BUTTON, event.joy,
-                                            data=GamePadButtonEventData(event.button, True)))
+                if event.type == pygame.JOYBUTTONDOWN:
+                    batch.add(GamePadEvent(GamePadEventType.BUTTON, event.joy,
+                                            data=GamePadButtonEventData(event.button, True)), captured)
                     self.previous_buttons[event.joy][event.button] = True
-                    changed_buttons.append((event.joy, event.button))
 
                 elif event.type == pygame.JOYBUTTONUP:
-                    self.q.put(GamePadEvent(GamePadEventType.BUTTON, event.joy,
-                                            data=GamePadButtonEventData(event.button, False)))
+                    batch.add(GamePadEvent(GamePadEventType.BUTTON, event.joy,
+                                            data=GamePadButtonEventData(event.button, False)), captured)
                     self.previous_buttons[event.joy][event.button] = False
 
                 elif event.type == pygame.JOYHATMOTION:
@@ -195,54 +383,41 @@ class PygameEventReader(Process):
 
                     # Detects specific button presses
                     if tt_h != p_h:
-                        self.q.put(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
-                                                data=GamePadHatEventData(event.hat, p_h, False)))
+                        batch.add(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
+                                                data=GamePadHatEventData(event.hat, p_h, False)), captured)
                         self.previous_hats[event.joy][event.hat][p_h] = False
 
                         p_h = tt_h
-                        self.q.put(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
+                        batch.add(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
                                                 data=GamePadHatEventData(event.hat,
-                                                                         p_h, True)))
+                                                                         p_h, True)), captured)
                         self.previous_hats[event.joy][event.hat][p_h] = True
-                        changed_hats.append((event.joy, event.hat, p_h))
 
                     if tt_v != p_v:
-                        self.q.put(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
-                                                data=GamePadHatEventData(event.hat, p_v, False)))
+                        batch.add(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
+                                                data=GamePadHatEventData(event.hat, p_v, False)), captured)
                         self.previous_hats[event.joy][event.hat][p_v] = False
 
                         p_v = tt_v
-                        self.q.put(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
+                        batch.add(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, event.joy,
                                                 data=GamePadHatEventData(event.hat,
-                                                                         p_v, True)))
+                                                                         p_v, True)), captured)
                         self.previous_hats[event.joy][event.hat][p_v] = True
-                        changed_hats.append((event.joy, event.hat, p_v))
 
                     # Saves the current state as the previous
                     self.previous_values[event.joy] = (p_h, p_v)
 
                     # endregion
 
-            # # region Button holding detection
-            #
-            # if self.repeat:
-            #     for j in self.previous_buttons:
-            #         for b in self.previous_buttons[j]:
-            #             if self.previous_buttons[j][b] and (j, b) not in changed_buttons:
-            #                 self.q.put(GamePadEvent(GamePadEventType.BUTTON, j, data=GamePadButtonEventData(b, True)))
-            #
-            #     for j in self.previous_hats:
-            #         for h in self.previous_hats[j]:
-            #             for d in self.previous_hats[j][h]:
-            #                 if self.previous_hats[j][h][d] and (j, h, d) not in changed_hats:
-            #                     self.q.put(GamePadEvent(GamePadEventType.DIRECTIONAL_PAD, j,
-            #                                             data=GamePadHatEventData(h, d, True)))
-            #
-            # # endregion
-
-            diff = time.time() - start
-            if diff < self.interval:
-                time.sleep(self.interval - diff)
+            # Only the presses and releases themselves are sent, holding something down is repeated by the Player
+            # that receives it, see Player.update
+
+            batch.flush()
+
+            if not self.event_driven:
+                diff = time.time() - start
+                if diff < self.interval:
+                    time.sleep(self.interval - diff)
 
 # endregion
 
@@ -252,8 +427,8 @@ class GamepadWrapper:
 
     event_reader = None
 
-    def __init__(self, mid: int = 0, polling_interval: float = 0):
-        self.joy = pgj.Joystick(mid)
+    def __init__(self, mid: int = 0, polling_interval: float = 0, event_driven: bool = True):
+        self.joy = init_joysticks().Joystick(mid)
         self.joy.init()
         self.interval = polling_interval
 
@@ -261,7 +436,7 @@ class GamepadWrapper:
             if self.event_reader is not None:
                 self.event_reader.start()
             else:
-                self.event_reader = PygameEventReader(self.interval)
+                self.event_reader = PygameEventReader(self.interval, event_driven=event_driven)
                 self.event_reader.start()
 
     def __del__(self):
@@ -0,0 +1,109 @@
+import math
+import time
+
+
+BUCKET_RATIO = 1.05
+"""Each histogram bucket is this many times wider than the one before it, so percentiles are within 5%"""
+
+SMALLEST_LATENCY = 1e-6
+"""Latencies under this many seconds all go in the first bucket"""
+
+BUCKET_COUNT = 400
+"""Number of buckets in each histogram, enough to reach a couple of minutes, anything longer goes in the last one"""
+
+STAGES = ('dequeued', 'applied', 'painted')
+"""The points an input is timed at, each of them is measured from when the input was captured"""
+
+
+class LatencyHistogram:
+    """Counts latencies in logarithmically sized buckets, recording one is a single increment,
+    and percentiles are read back from the bucket counts whenever they're wanted"""
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """Adds a latency to the histogram"""
+        index = 0
+        if seconds > SMALLEST_LATENCY:
+            index = min(int(math.log(seconds / SMALLEST_LATENCY, BUCKET_RATIO)) + 1, BUCKET_COUNT - 1)
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Returns the latency that p percent of the recorded ones are at or under, as the upper edge of its bucket"""
+        if not self.count:
+            return 0.0
+
+        target = self.count * p / 100
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(SMALLEST_LATENCY * BUCKET_RATIO ** index, self.max)
+        return self.max
+
+    def clear(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class InputLatency:
+    """Times every input from when the reader captured it to when it was taken off the event queue, when the board
+    function it's mapped to was applied, and when the frame showing the change was painted, each with its own histogram.
+
+    summary can be called at any point while the game is running, and report gives the same numbers as text"""
+
+    def __init__(self):
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+        self.unpainted = []
+
+    def dequeued(self, captured: float):
+        """Records an input being taken off the event queue"""
+        self.stages['dequeued'].record(time.monotonic() - captured)
+
+    def applied(self, captured: float):
+        """Records an input's board function being applied, it's then waiting to be painted"""
+        self.stages['applied'].record(time.monotonic() - captured)
+        self.unpainted.append(captured)
+
+    def painted(self):
+        """Records every applied input that's been waiting for the frame that was just painted"""
+        if self.unpainted:
+            now = time.monotonic()
+            histogram = self.stages['painted']
+            for captured in self.unpainted:
+                histogram.record(now - captured)
+            self.unpainted.clear()
+
+    def summary(self) -> dict:
+        """Returns the count, mean, p50, p95, p99, and max of each stage in seconds"""
+        return {stage: {'count': h.count, 'mean': h.mean, 'p50': h.percentile(50), 'p95': h.percentile(95),
+                        'p99': h.percentile(99), 'max': h.max}
+                for stage, h in self.stages.items()}
+
+    def report(self) -> str:
+        """Returns the summary as a table in milliseconds"""
+        lines = ['{:>9} {:>7} {:>8} {:>8} {:>8} {:>8}'.format('Stage', 'Count', 'p50', 'p95', 'p99', 'Max')]
+        for stage, s in self.summary().items():
+            lines.append('{:>9} {:>7} {:>6.2f}ms {:>6.2f}ms {:>6.2f}ms {:>6.2f}ms'.format(
+                stage, s['count'], s['p50'] * 1000, s['p95'] * 1000, s['p99'] * 1000, s['max'] * 1000))
+        return '\n'.join(lines)
+
+    def clear(self):
+        for h in self.stages.values():
+            h.clear()
+        self.unpainted.clear()
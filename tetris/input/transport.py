@@ -0,0 +1,111 @@
+import struct
+import time
+from collections import deque
+from multiprocessing import get_context
+from multiprocessing.queues import Queue
+from queue import Empty
+
+from .gamepad import GamePadEvent
+
+
+RECORD = struct.Struct('<Id')
+"""A single event as it's sent between processes, the event's code and the time.monotonic time it was captured at,
+the events themselves are shared instances so the time can't be kept on them"""
+
+
+def encode_event(event: GamePadEvent, captured: float) -> bytes:
+    """Packs an event and its capture time into a single fixed size record"""
+    return RECORD.pack(event.code, captured)
+
+
+def decode_events(batch: bytes) -> list:
+    """Unpacks every record in a batch back into (event, capture time) pairs, in the order they were added,
+    the events are the shared instances, so this doesn't create any new ones"""
+    decode = GamePadEvent.decode
+    return [(decode(code), captured) for code, captured in RECORD.iter_unpack(batch)]
+
+
+class EventQueue(Queue):
+    """A multiprocessing Queue for batches of events that an event loop can also wait on, through fileno"""
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize, ctx=get_context())
+
+    def fileno(self) -> int:
+        """Returns the file descriptor of the pipe that the batches arrive on, it's readable whenever a batch may be
+        waiting, multiprocessing doesn't expose it, so this is the only place that depends on how its queues work"""
+        return self._reader.fileno()
+
+
+class EventBatcher:
+    """Collects the events from a poll cycle, and then sends all of them across the queue as a single bytes message
+    of fixed size records, instead of pickling and sending each event on its own"""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.buffer) // RECORD.size
+
+    def add(self, event: GamePadEvent, captured: float = None):
+        """Adds an event to the current batch, captured defaults to now"""
+        self.buffer += encode_event(event, time.monotonic() if captured is None else captured)
+
+    def flush(self):
+        """Sends the current batch, if it has anything in it"""
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))
+            self.buffer.clear()
+
+
+class EventReceiver:
+    """The receiving end of an EventBatcher, it unpacks each batch as it arrives and hands out the events from it.
+
+    get and get_nowait work the same way as they do on a queue of events, drain takes everything that's arrived at once
+    so that a whole frame's worth of input can be handled together, and drain_timed does the same but also gives
+    the time each event was captured at."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.pending = deque()
+
+    def __receive(self, block: bool = True, timeout: float = None):
+        """Waits for the next batch and unpacks it, raises queue.Empty if nothing arrives in time"""
+        self.pending.extend(decode_events(self.queue.get(block, timeout)))
+
+    def get(self, block: bool = True, timeout: float = None) -> GamePadEvent:
+        """Returns the next event, waiting for one to arrive if there aren't any"""
+        if not self.pending:
+            self.__receive(block, timeout)
+        return self.pending.popleft()[0]
+
+    def get_nowait(self) -> GamePadEvent:
+        """Returns the next event, raises queue.Empty if there isn't one"""
+        return self.get(False)
+
+    def drain(self, timeout: float = 0) -> list:
+        """Returns every event that's arrived, if there aren't any then it waits up to timeout seconds for some"""
+        return [event for event, _ in self.drain_timed(timeout)]
+
+    def drain_timed(self, timeout: float = 0) -> list:
+        """Returns every event that's arrived as (event, capture time) pairs,
+        if there aren't any then it waits up to timeout seconds for some"""
+        try:
+            if not self.pending and timeout > 0:
+                self.__receive(True, timeout)
+
+            while True:
+                self.__receive(False)
+        except Empty:
+            pass
+
+        result = list(self.pending)
+        self.pending.clear()
+        return result
+
+    def fileno(self) -> int:
+        """Returns a file descriptor that becomes readable whenever a batch may have arrived, so that an event loop can
+        wait on it instead of polling, only queues that provide a fileno of their own, like EventQueue, can be waited on"""
+        assert hasattr(self.queue, 'fileno'), "A {} can't be waited on".format(type(self.queue).__name__)
+        return self.queue.fileno()
@@ -0,0 +1,49 @@
+SCORE_DIGITS = 8
+"""Number of digits the score box leaves room for, so that it doesn't change size as the scores go up"""
+
+SCORE_LABEL_WIDTH = len("    Score: ")
+"""Width of the longest label in the score box, which its numbers are added onto"""
+
+PREVIEW_HEIGHT = 6
+"""Number of lines the boxed next piece preview takes up in the score box"""
+
+
+class DisplayLayout:
+    """The sizes and positions of each panel of the Tetris display, the controls box on the left, then each player's
+    board, and the score box on the right.
+
+    Everything is worked out once from the board dimensions, player count, scale, and controls box size,
+    so none of the panels have to be rendered to find out how big they are."""
+
+    def __init__(self, pos_x: int, pos_y: int, num_players: int, board_width: int, board_height: int, scale: int,
+                 control_width: int = 0, control_height: int = 0):
+        self.key = (pos_x, pos_y, num_players, board_width, board_height, scale, control_width, control_height)
+        self.offset = (pos_x, pos_y)
+
+        self.control_width = control_width
+        self.control_height = control_height
+
+        # Each board has a border around it
+        self.board_width_adj = board_width * scale + 2
+        self.board_width_total = num_players * self.board_width_adj
+        self.board_height_total = board_height * scale + 2
+
+        # The highscore line, 4 lines per player, the next piece title and its preview, and the border
+        self.score_content_width = SCORE_LABEL_WIDTH + SCORE_DIGITS
+        self.score_width = self.score_content_width + 2
+        self.score_height = 1 + 4 * num_players + 1 + PREVIEW_HEIGHT + 2
+
+        self.width = self.control_width + self.board_width_total + self.score_width
+        self.height = max(self.control_height, self.board_height_total, self.score_height)
+        self.midpoint = (self.width // 2, self.height // 2)
+
+    def board_offset(self, index: int) -> tuple:
+        """Returns the (x, y) position of the board for the player at the given index"""
+        x, y = self.offset
+        return x + self.control_width + self.board_width_adj * index, y
+
+    @property
+    def score_offset(self) -> tuple:
+        """Returns the (x, y) position of the score box"""
+        x, y = self.offset
+        return x + self.control_width + self.board_width_total, y
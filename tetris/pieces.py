@@ -1,38 +1,101 @@
-import curses
 import numpy as np
 
 
+# region Colors
+
+# These match curses' own color numbers, they're defined here so that building a piece doesn't require curses
+
+COLOR_BLACK = 0
+COLOR_RED = 1
+COLOR_GREEN = 2
+COLOR_YELLOW = 3
+COLOR_BLUE = 4
+COLOR_MAGENTA = 5
+COLOR_CYAN = 6
+COLOR_WHITE = 7
+
+# endregion
+
+
 class Block:
     """Defines the class for a tetris piece, each piece contains 4 squares,
-    the color and style and shape can be defined here"""
+    the color and style and shape can be defined here.
 
-    def __init__(self, pos_x: int, pos_y: int):
-        self.offset = (pos_x, pos_y)
-        self.num = -1
+    Instances only hold the piece's offset and rotation, everything else about the piece is shared by its class,
+    the shape of each rotation is looked up in the tables generated at the bottom of this module."""
 
-        self.color = curses.COLOR_WHITE
-        self.pair_initialized = False
-        self.pair_index = 0
-        self.symbol = '\u2592'
+    __slots__ = ('offset', 'rotation')
 
-        self.rotation = 0
-        self.max_rotation = 0
+    num = -1
+    color = COLOR_WHITE
+    pair_initialized = False
+    pair_index = 0
+    symbol = '\u2592'
+    max_rotation = 0
 
-        self.locations = np.zeros(shape=(4, 4), dtype=int)
+    shapes = ()
+    """Contains a tuple of (row, column) cells for each rotation of the piece"""
 
-        self.create_locations()
+    def __init__(self, pos_x: int, pos_y: int):
+        self.offset = (pos_x, pos_y)
+        self.rotation = 0
 
-    def init_color_pair(self, index: int = 1):
-        curses.init_pair(index, self.color, self.color)
-        self.pair_initialized = True
-        self.pair_index = index
+    @classmethod
+    def init_color_pair(cls, index: int = 1):
+        import curses
+        curses.init_pair(index, cls.color, cls.color)
+        cls.pair_initialized = True
+        cls.pair_index = index
+
+    # region Shape tables
+
+    @property
+    def locations(self) -> np.ndarray:
+        """Returns the read-only 4x4 location array for the current rotation"""
+        return LOCATIONS[self.num][self.rotation]
+
+    @property
+    def cells(self) -> tuple:
+        """Returns the (row, column) pairs of the filled cells for the current rotation"""
+        return CELLS[self.num][self.rotation]
+
+    @property
+    def cell_arrays(self) -> tuple:
+        """Returns the read-only (rows, columns) index arrays of the filled cells for the current rotation"""
+        return CELL_ARRAYS[self.num][self.rotation]
+
+    @property
+    def row_masks(self) -> tuple:
+        """Returns the bitmasks for each of the 4 rows of the piece in its current rotation,
+        bit j of a mask is set if column j of that row is filled"""
+        return ROW_MASKS[self.num][self.rotation]
+
+    def rotated_row_masks(self, clockwise: bool = False) -> tuple:
+        """Returns the row bitmasks the piece would have after rotating it, without actually rotating it"""
+        rotation = self.rotation + (-1 if clockwise else 1)
+        return ROW_MASKS[self.num][rotation % self.max_rotation]
+
+    @property
+    def bounds(self) -> tuple:
+        """Returns the (min row, min column, max row, max column) bounding box of the current rotation"""
+        return BOUNDS[self.num][self.rotation]
+
+    @property
+    def skirt(self) -> tuple:
+        """Returns the lowest filled row of each of the 4 columns of the current rotation, -1 for empty columns"""
+        return SKIRTS[self.num][self.rotation]
+
+    @property
+    def left_profile(self) -> tuple:
+        """Returns the leftmost filled column of each of the 4 rows of the current rotation, -1 for empty rows"""
+        return LEFT_PROFILES[self.num][self.rotation]
+
+    @property
+    def right_profile(self) -> tuple:
+        """Returns the rightmost filled column of each of the 4 rows of the current rotation, -1 for empty rows"""
+        return RIGHT_PROFILES[self.num][self.rotation]
 
-    def create_locations(self):
-        """Generates the location arrays based on the rotation value"""
-        # resets the locations
-        for i in range(4):
-            for j in range(4):
-                self.locations[i, j] = 0
+    # endregion
 
     # region Movement
 
@@ -65,8 +128,6 @@ class Block:
         elif self.rotation < 0:
             self.rotation = self.max_rotation - 1
 
-        self.create_locations()
-
     def descend(self, lines: int = 1):
         """Drops the block by the number of lines provided, default is 1"""
         x, y = self.offset
@@ -75,169 +136,78 @@ class Block:
     # endregion
 
     def __str__(self):
-
-        result = ""
-        for i in range(4):
-            for j in range(4):
-                result += ' ' if self.locations[i, j] != 1 else self.symbol
-            result += '\n'
-
-        return result[:-1]
+        return PREVIEWS[self.num][self.rotation]
 
     def add_to_screen(self, screen):
+        import curses
         x, y = self.offset
 
-        for i in range(4):
-            for j in range(4):
-                if self.locations[i, j] != 0:
-                    screen.addstr(y + i, x + j, self.symbol, curses.color_pair(self.pair_index))
+        for i, j in self.cells:
+            screen.addstr(y + i, x + j, self.symbol, curses.color_pair(self.pair_index))
 
 
 class TBlock(Block):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y)
-        self.color = curses.COLOR_YELLOW
-        # self.init_color_pair(1)
-        self.max_rotation = 4
-        self.num = 0
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[1, 1] = 1
-            self.locations[1, 2] = 1
-            self.locations[1, 3] = 1
-            self.locations[2, 2] = 1
-        elif self.rotation == 1:
-            self.locations[2, 1] = 1
-            self.locations[2, 0] = 1
-            self.locations[3, 1] = 1
-            self.locations[2, 2] = 1
-        elif self.rotation == 2:
-            self.locations[1, 1] = 1
-            self.locations[1, 2] = 1
-            self.locations[1, 3] = 1
-            self.locations[2, 0] = 1
-        elif self.rotation == 3:
-            self.locations[1, 1] = 1
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
+    __slots__ = ()
 
+    color = COLOR_YELLOW
+    max_rotation = 4
+    num = 0
+    shapes = (((1, 1), (1, 2), (1, 3), (2, 2)),
+              ((2, 1), (2, 0), (3, 1), (2, 2)),
+              ((1, 1), (1, 2), (1, 3), (2, 0)),
+              ((1, 1), (2, 0), (2, 1), (2, 2)))
 
-class OBlock(Block):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y)
-        self.color = curses.COLOR_BLUE
-        # self.init_color_pair(2)
-        self.max_rotation = 1
-        self.num = 1
 
-    def create_locations(self):
-        super().create_locations()
+class OBlock(Block):
+    __slots__ = ()
 
-        self.locations[1, 1] = 1
-        self.locations[2, 2] = 1
-        self.locations[2, 1] = 1
-        self.locations[1, 2] = 1
+    color = COLOR_BLUE
+    max_rotation = 1
+    num = 1
+    shapes = (((1, 1), (2, 2), (2, 1), (1, 2)),)
 
 
 class IBlock(Block):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y)
-        self.color = curses.COLOR_RED
-        # self.init_color_pair(3)
-        self.max_rotation = 2
-        self.num = 2
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[0, 0] = 1
-            self.locations[0, 1] = 1
-            self.locations[0, 2] = 1
-            self.locations[0, 3] = 1
-        elif self.rotation == 1:
-            self.locations[0, 2] = 1
-            self.locations[1, 2] = 1
-            self.locations[2, 2] = 1
-            self.locations[3, 2] = 1
+    __slots__ = ()
+
+    color = COLOR_RED
+    max_rotation = 2
+    num = 2
+    shapes = (((0, 0), (0, 1), (0, 2), (0, 3)),
+              ((0, 2), (1, 2), (2, 2), (3, 2)))
 
 
 # region Isomers
 
 class IsomerBlock(Block):
     """The L-shaped blocks, use mirrored for right one"""
-    def __init__(self, pos_x: int, pos_y: int, mirrored: bool = False):
-        super().__init__(pos_x, pos_y)
-        self.mirrored = mirrored
-        self.max_rotation = 4
+    __slots__ = ()
+
+    mirrored = False
+    max_rotation = 4
 
 
 class LBlock(IsomerBlock):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y)
-        self.color = curses.COLOR_WHITE
-        # self.init_color_pair(4)
-        self.num = 3
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[1, 1] = 1
-            self.locations[1, 2] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-        elif self.rotation == 1:
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
-            self.locations[3, 2] = 1
-        elif self.rotation == 2:
-            self.locations[1, 1] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-            self.locations[3, 0] = 1
-        elif self.rotation == 3:
-            self.locations[1, 0] = 1
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
+    __slots__ = ()
+
+    color = COLOR_WHITE
+    num = 3
+    shapes = (((1, 1), (1, 2), (2, 1), (3, 1)),
+              ((2, 0), (2, 1), (2, 2), (3, 2)),
+              ((1, 1), (2, 1), (3, 1), (3, 0)),
+              ((1, 0), (2, 0), (2, 1), (2, 2)))
 
 
 class JBlock(IsomerBlock):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y, True)
-        self.color = curses.COLOR_MAGENTA
-        # self.init_color_pair(5)
-        self.num = 4
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[1, 1] = 1
-            self.locations[3, 2] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-        elif self.rotation == 1:
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
-            self.locations[3, 0] = 1
-        elif self.rotation == 2:
-            self.locations[1, 1] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-            self.locations[1, 0] = 1
-        elif self.rotation == 3:
-            self.locations[1, 2] = 1
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
+    __slots__ = ()
+
+    color = COLOR_MAGENTA
+    mirrored = True
+    num = 4
+    shapes = (((1, 1), (3, 2), (2, 1), (3, 1)),
+              ((2, 0), (2, 1), (2, 2), (3, 0)),
+              ((1, 1), (2, 1), (3, 1), (1, 0)),
+              ((1, 2), (2, 0), (2, 1), (2, 2)))
 
 # endregion
 
@@ -246,54 +216,100 @@ class JBlock(IsomerBlock):
 
 class ZigZagBlock(Block):
     """The L-shaped blocks, use mirrored for right one"""
+    __slots__ = ()
 
-    def __init__(self, pos_x: int, pos_y: int, mirrored: bool = False):
-        super().__init__(pos_x, pos_y)
-        self.mirrored = mirrored
-        self.max_rotation = 2
+    mirrored = False
+    max_rotation = 2
 
 
 class SBlock(ZigZagBlock):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y)
-        self.color = curses.COLOR_CYAN
-        # self.init_color_pair(6)
-        self.num = 5
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[1, 2] = 1
-            self.locations[2, 2] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-        elif self.rotation == 1:
-            self.locations[2, 0] = 1
-            self.locations[2, 1] = 1
-            self.locations[3, 1] = 1
-            self.locations[3, 2] = 1
+    __slots__ = ()
+
+    color = COLOR_CYAN
+    num = 5
+    shapes = (((1, 2), (2, 2), (2, 1), (3, 1)),
+              ((2, 0), (2, 1), (3, 1), (3, 2)))
 
 
 class ZBlock(ZigZagBlock):
-    def __init__(self, pos_x: int, pos_y: int):
-        super().__init__(pos_x, pos_y, True)
-        self.color = curses.COLOR_GREEN
-        # self.init_color_pair(7)
-        self.num = 6
-
-    def create_locations(self):
-        super().create_locations()
-
-        if self.rotation == 0:
-            self.locations[1, 1] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
-            self.locations[3, 2] = 1
-        elif self.rotation == 1:
-            self.locations[3, 0] = 1
-            self.locations[3, 1] = 1
-            self.locations[2, 1] = 1
-            self.locations[2, 2] = 1
+    __slots__ = ()
+
+    color = COLOR_GREEN
+    mirrored = True
+    num = 6
+    shapes = (((1, 1), (2, 1), (2, 2), (3, 2)),
+              ((3, 0), (3, 1), (2, 1), (2, 2)))
+
+# endregion
+
+
+BLOCK_TYPES = (TBlock, OBlock, IBlock, LBlock, JBlock, SBlock, ZBlock)
+"""Contains the piece classes, indexed by their num"""
+
+
+# region Shape tables
+
+def create_locations(cells: tuple) -> np.ndarray:
+    """Generates a read-only 4x4 location array from a tuple of (row, column) cells"""
+    locations = np.zeros(shape=(4, 4), dtype=int)
+    for i, j in cells:
+        locations[i, j] = 1
+    locations.flags.writeable = False
+    return locations
+
+
+def create_cell_arrays(cells: tuple) -> tuple:
+    """Generates read-only (rows, columns) index arrays from a tuple of (row, column) cells"""
+    rows = np.array([i for i, _ in cells], dtype=int)
+    cols = np.array([j for _, j in cells], dtype=int)
+    rows.flags.writeable = False
+    cols.flags.writeable = False
+    return rows, cols
+
+
+def create_row_masks(cells: tuple) -> tuple:
+    """Converts a tuple of (row, column) cells into a tuple of 4 row bitmasks,
+    bit j of row i is set if the cell (i, j) is filled"""
+    masks = [0] * 4
+    for i, j in cells:
+        masks[i] |= 1 << j
+    return tuple(masks)
+
+
+def create_bounds(cells: tuple) -> tuple:
+    """Finds the (min row, min column, max row, max column) bounding box of a tuple of (row, column) cells"""
+    rows = [i for i, _ in cells]
+    cols = [j for _, j in cells]
+    return min(rows), min(cols), max(rows), max(cols)
+
+
+def create_skirt(cells: tuple) -> tuple:
+    """Finds the lowest filled row of each of the 4 columns, -1 if the column is empty"""
+    return tuple(max((i for i, j in cells if j == col), default=-1) for col in range(4))
+
+
+def create_profile(cells: tuple, right: bool = False) -> tuple:
+    """Finds the leftmost, or rightmost, filled column of each of the 4 rows, -1 if the row is empty"""
+    extreme = max if right else min
+    return tuple(extreme((j for i, j in cells if i == row), default=-1) for row in range(4))
+
+
+def create_preview(cells: tuple, symbol: str) -> str:
+    """Creates the 4x4 string representation of a tuple of (row, column) cells"""
+    return '\n'.join(''.join(symbol if (i, j) in cells else ' ' for j in range(4)) for i in range(4))
+
+
+CELLS = tuple(block_type.shapes for block_type in BLOCK_TYPES)
+"""Contains the (row, column) cells for each rotation of each piece, indexed by [num][rotation]"""
+
+LOCATIONS = tuple(tuple(create_locations(c) for c in shapes) for shapes in CELLS)
+CELL_ARRAYS = tuple(tuple(create_cell_arrays(c) for c in shapes) for shapes in CELLS)
+ROW_MASKS = tuple(tuple(create_row_masks(c) for c in shapes) for shapes in CELLS)
+BOUNDS = tuple(tuple(create_bounds(c) for c in shapes) for shapes in CELLS)
+SKIRTS = tuple(tuple(create_skirt(c) for c in shapes) for shapes in CELLS)
+LEFT_PROFILES = tuple(tuple(create_profile(c) for c in shapes) for shapes in CELLS)
+RIGHT_PROFILES = tuple(tuple(create_profile(c, True) for c in shapes) for shapes in CELLS)
+PREVIEWS = tuple(tuple(create_preview(c, block_type.symbol) for c in block_type.shapes)
+                 for block_type in BLOCK_TYPES)
 
 # endregion
@@ -0,0 +1,164 @@
+import time
+from functools import partial
+
+from .engine import BoardEngine, TetrisEngine
+from .shared import KeyMappings
+
+
+MAGIC = b'TRPL'
+"""The first bytes of every replay file"""
+
+VERSION = 1
+
+GRAVITY = len(KeyMappings)
+"""The action recorded for a gravity step"""
+
+LOSE = GRAVITY + 1
+"""The action recorded for a board losing, whether it was gravity or a check after a move that ended its game,
+the rest of the actions are KeyMappings values"""
+
+ACTION_BITS = 3
+"""Number of low bits of each packed action that hold the action, the rest hold the player"""
+
+
+# region Varints
+
+def write_varint(buffer: bytearray, value: int):
+    """Appends a non-negative int to the buffer, 7 bits per byte with the high bit set on every byte but the last"""
+    assert value >= 0, "Varints can't be negative"
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, position: int) -> tuple:
+    """Reads the varint that starts at position, returns the value and the position just after it"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+# endregion
+
+
+class Replay:
+    """Everything needed to play a game again exactly as it happened, the seed and settings the game was created with,
+    and every action that changed a board, in order.
+
+    actions is a list of (milliseconds since the start, player index, action), where action is the value of a
+    KeyMappings command, GRAVITY, or LOSE.
+
+    As bytes it's the header and then two varints per action, the milliseconds since the previous action and the
+    player and action packed together, so most actions take up only 2 bytes."""
+
+    def __init__(self, seed: int, num_players: int = 1, board_width: int = 10, board_height: int = 20,
+                 bag: bool = False, actions: list = None):
+        assert seed is not None and seed >= 0, "A replay needs the non-negative seed that the game was created with"
+        self.seed = seed
+        self.num_players = num_players
+        self.board_width = board_width
+        self.board_height = board_height
+        self.bag = bag
+        self.actions = actions if actions is not None else []
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def duration(self) -> float:
+        """Returns the number of seconds between the start of the game and the last action"""
+        return self.actions[-1][0] / 1000 if self.actions else 0.0
+
+    def to_bytes(self) -> bytes:
+        buffer = bytearray(MAGIC)
+        buffer.append(VERSION)
+        for value in (self.seed, self.num_players, self.board_width, self.board_height, int(self.bag)):
+            write_varint(buffer, value)
+
+        last = 0
+        for when, player, action in self.actions:
+            write_varint(buffer, when - last)
+            write_varint(buffer, (player << ACTION_BITS) | action)
+            last = when
+
+        return bytes(buffer)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'Replay':
+        assert data[:len(MAGIC)] == MAGIC, "Not a replay"
+        assert data[len(MAGIC)] == VERSION, "Unsupported replay version {}".format(data[len(MAGIC)])
+
+        position = len(MAGIC) + 1
+        header = []
+        for _ in range(5):
+            value, position = read_varint(data, position)
+            header.append(value)
+        seed, num_players, board_width, board_height, bag = header
+
+        actions = []
+        when = 0
+        mask = (1 << ACTION_BITS) - 1
+        while position < len(data):
+            delta, position = read_varint(data, position)
+            packed, position = read_varint(data, position)
+            when += delta
+            actions.append((when, packed >> ACTION_BITS, packed & mask))
+
+        return Replay(seed, num_players, board_width, board_height, bool(bag), actions)
+
+    def save(self, path: str):
+        with open(path, 'wb') as fp:
+            fp.write(self.to_bytes())
+
+    @staticmethod
+    def load(path: str) -> 'Replay':
+        with open(path, 'rb') as fp:
+            return Replay.from_bytes(fp.read())
+
+
+class ReplayRecorder:
+    """Records the actions of a game into a Replay as they happen, each board calls record with its player index
+    whenever one of its commands is used, gravity moves it, or it loses, reset starts the recording over for a new game"""
+
+    def __init__(self, seed: int, num_players: int = 1, board_width: int = 10, board_height: int = 20,
+                 bag: bool = False):
+        self.replay = Replay(seed, num_players, board_width, board_height, bag)
+        self.time_start = time.monotonic()
+
+    def reset(self):
+        self.replay.actions = []
+        self.time_start = time.monotonic()
+
+    def record(self, player: int, action: int):
+        self.replay.actions.append((int((time.monotonic() - self.time_start) * 1000), player, action))
+
+
+def play_replay(replay: Replay) -> TetrisEngine:
+    """Plays the replay's actions back on a headless engine as fast as possible, without waiting for any of the
+    recorded times, and returns the engine in the state that the game finished in"""
+    engine = TetrisEngine(replay.num_players, replay.board_width, replay.board_height, replay.seed, replay.bag)
+    engine.newgame()
+
+    functions = [tuple(b.get_function(KeyMappings(i)) for i in range(GRAVITY)) + (b.step, partial(end_game, b))
+                 for b in engine.boards]
+    for _, player, action in replay.actions:
+        functions[player][action]()
+
+    return engine
+
+
+def end_game(board: BoardEngine):
+    """Plays back a LOSE, the board has usually already lost by itself in the gravity step before it"""
+    if board.playing:
+        board.lose()
+
+
+def game_state(engine: TetrisEngine) -> list:
+    """Returns what each board ended up with, for checking that a replay finishes the same way the game did"""
+    return [(b.zobrist, b.score, b.lines, b.level, b.pieces_placed, b.playing) for b in engine.boards]
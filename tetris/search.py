@@ -0,0 +1,133 @@
+from collections import deque
+import numpy as np
+
+from .shared import KeyMappings
+from .pieces import BLOCK_TYPES, CELLS
+
+
+SEARCH_PADDING = 4
+"""Number of rows above the board, and columns on either side of it, that a piece's 4x4 box can reach into"""
+
+
+class Placement:
+    """A final resting position of a piece, and the moves that get the piece there from where it started.
+
+    x and y are the offset of the piece's 4x4 box relative to the board, the path always ends with a DROP."""
+
+    __slots__ = ('num', 'rotation', 'x', 'y', 'path')
+
+    def __init__(self, num: int, rotation: int, x: int, y: int, path: tuple):
+        self.num = num
+        self.rotation = rotation
+        self.x = x
+        self.y = y
+        self.path = path
+
+    @property
+    def cells(self) -> tuple:
+        """Returns the (row, column) board coordinates that the piece will fill"""
+        return tuple((self.y + i, self.x + j) for i, j in CELLS[self.num][self.rotation])
+
+    def __str__(self) -> str:
+        return "{} at ({}, {}) rotation {}: {}".format(BLOCK_TYPES[self.num].__name__, self.x, self.y, self.rotation,
+                                                      ', '.join(m.name for m in self.path))
+
+
+def fit_tables(settled: np.ndarray, num: int) -> list:
+    """Works out every position each rotation of the piece can occupy on a board with the given settled cells,
+    returns a list of tables, one per rotation, where table[y + SEARCH_PADDING][x + SEARCH_PADDING] is True
+    if the piece's box fits at (x, y).
+
+    Each table is built with one numpy slice per cell of the piece, instead of checking positions one at a time."""
+    width, height = settled.shape
+    p = SEARCH_PADDING
+
+    # Free cells of the board, padded with open space above it, and walls on either side and below
+    free = np.zeros(shape=(height + 2 * p, width + 2 * p), dtype=bool)
+    free[:p, p:p + width] = True
+    free[p:p + height, p:p + width] = settled.T == 0
+
+    rows = height + p
+    cols = width + p
+
+    tables = []
+    for cells in CELLS[num]:
+        fits = np.ones(shape=(rows, cols), dtype=bool)
+        for i, j in cells:
+            fits &= free[i:i + rows, j:j + cols]
+        tables.append(fits.tolist())
+
+    return tables
+
+
+def find_placements(board) -> list:
+    """Finds every legal final resting position that the board's current piece can reach using the shift, rotate, and
+    soft drop moves, returns a list of Placements, one for each distinct (x, y, rotation).
+
+    The paths are found with a breadth first search, so they assume the piece doesn't fall on its own while they're
+    being played out."""
+    piece = board.current_piece
+    if piece is None:
+        return []
+
+    x, y = board.piece_position()
+    return search_placements(board.settled, piece.num, piece.rotation, x, y)
+
+
+def search_placements(settled: np.ndarray, num: int, rotation: int, x: int, y: int) -> list:
+    """Finds every legal final resting position for a piece with the given num that starts at (x, y) and rotation,
+    on a board with the given settled cells, this lets boards that only exist hypothetically be searched too"""
+    rotations = len(CELLS[num])
+    p = SEARCH_PADDING
+    tables = fit_tables(settled, num)
+    rows = len(tables[0])
+    cols = len(tables[0][0])
+
+    start = (x, rotation, y)
+    if not (0 <= x + p < cols and 0 <= y + p < rows) or not tables[rotation][y + p][x + p]:
+        return []
+
+    moves = ((KeyMappings.ROTATE, 0, 1, 0),
+             (KeyMappings.SHIFT_LEFT, -1, 0, 0),
+             (KeyMappings.SHIFT_RIGHT, 1, 0, 0),
+             (KeyMappings.SOFT_DROP, 0, 0, 1))
+
+    parents = {start: None}
+    queue = deque([start])
+    resting = []
+
+    while queue:
+        state = queue.popleft()
+        x, r, y = state
+
+        for move, dx, dr, dy in moves:
+            nx = x + dx
+            nr = (r + dr) % rotations
+            ny = y + dy
+            if 0 <= nx + p < cols and ny + p < rows and tables[nr][ny + p][nx + p]:
+                child = (nx, nr, ny)
+                if child not in parents:
+                    parents[child] = (state, move)
+                    queue.append(child)
+
+        if y + 1 + p >= rows or not tables[r][y + 1 + p][x + p]:
+            resting.append(state)
+
+    result = []
+    for state in resting:
+        path = []
+        current = state
+        while parents[current] is not None:
+            current, move = parents[current]
+            path.append(move)
+        path.reverse()
+
+        # Whatever soft drops finish off the path are the same as a single hard drop
+        while path and path[-1] == KeyMappings.SOFT_DROP:
+            path.pop()
+        path.append(KeyMappings.DROP)
+
+        x, r, y = state
+        result.append(Placement(num, r, x, y, tuple(path)))
+
+    return result
@@ -12,20 +12,7 @@ class KeyMappings(Enum):
 
 
 def int_to_block(i: int, x_pos, y_pos) -> Block:
-    if i == 0:
-        return TBlock(x_pos, y_pos)
-    elif i == 1:
-        return OBlock(x_pos, y_pos)
-    elif i == 2:
-        return IBlock(x_pos, y_pos)
-    elif i == 3:
-        return LBlock(x_pos, y_pos)
-    elif i == 4:
-        return JBlock(x_pos, y_pos)
-    elif i == 5:
-        return SBlock(x_pos, y_pos)
-    elif i == 6:
-        return ZBlock(x_pos, y_pos)
+    return BLOCK_TYPES[i](x_pos, y_pos)
 
 
 def iteration_delay(level: int) -> float:
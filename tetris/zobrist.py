@@ -0,0 +1,115 @@
+import random
+from collections import OrderedDict
+import numpy as np
+
+from .pieces import BLOCK_TYPES
+
+
+KEY_PADDING = 4
+"""Number of positions past each edge of the board that a piece's 4x4 box can be at, and still get its own key"""
+
+PREVIEW_DEPTH = 8
+"""Number of upcoming pieces that have their own keys, so searches that look further ahead than this can't be cached"""
+
+
+class ZobristKeys:
+    """The random 64 bit keys used to hash the state of a board of a given size.
+
+    A board's hash is the xor of the keys of its filled cells, and of its current piece's num, rotation, x, and y,
+    so placing a piece, or moving it, only has to xor in or out the keys that changed."""
+
+    def __init__(self, width: int, height: int, seed: int = 0):
+        rng = random.Random(seed)
+        self.width = width
+        self.height = height
+
+        self.cells = [[rng.getrandbits(64) for _ in range(width)] for _ in range(height)]
+        self.cell_array = np.array(self.cells, dtype=np.uint64)
+
+        self.nums = [rng.getrandbits(64) for _ in BLOCK_TYPES]
+        self.rotations = [rng.getrandbits(64) for _ in range(4)]
+        self.xs = [rng.getrandbits(64) for _ in range(width + 2 * KEY_PADDING)]
+        self.ys = [rng.getrandbits(64) for _ in range(height + 2 * KEY_PADDING)]
+
+        self.upcoming = [[rng.getrandbits(64) for _ in BLOCK_TYPES] for _ in range(PREVIEW_DEPTH)]
+
+    def row(self, row: int, bits: int) -> int:
+        """Returns the hash of the cells in the given row, bits has a bit set for each filled column"""
+        result = 0
+        keys = self.cells[row]
+        while bits:
+            low = bits & -bits
+            result ^= keys[low.bit_length() - 1]
+            bits ^= low
+        return result
+
+    def grid(self, occupied: np.ndarray) -> int:
+        """Returns the hash of every cell that's True in an array of shape (height, width)"""
+        return int(np.bitwise_xor.reduce(self.cell_array[occupied], initial=np.uint64(0)))
+
+    def piece(self, num: int, rotation: int, x: int, y: int) -> int:
+        """Returns the hash of a piece at (x, y) relative to the board"""
+        return self.nums[num] ^ self.rotations[rotation] ^ self.xs[x + KEY_PADDING] ^ self.ys[y + KEY_PADDING]
+
+    def pieces(self, nums: tuple) -> int:
+        """Returns the hash of a list of upcoming pieces, the same piece hashes differently depending on when it comes"""
+        result = 0
+        for i, num in enumerate(nums):
+            result ^= self.upcoming[i][num]
+        return result
+
+
+_keys = {}
+
+
+def zobrist_keys(width: int, height: int) -> ZobristKeys:
+    """Returns the keys for boards of the given size, every board of the same size shares the same keys,
+    so that hashes can be compared between them"""
+    if (width, height) not in _keys:
+        _keys[(width, height)] = ZobristKeys(width, height)
+    return _keys[(width, height)]
+
+
+class TranspositionTable:
+    """A bounded cache of search results keyed by board hash, once it's full the least recently used entry is dropped
+    to make room for the new one.
+
+    hits and misses count how many lookups found something, and how many didn't."""
+
+    def __init__(self, capacity: int = 65536):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int):
+        """Returns the entry stored under key, or None if there isn't one"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: int, entry):
+        """Stores an entry under key, dropping the least recently used entry if the table is full"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Empties the table and resets the counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the fraction of lookups that found an entry"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0